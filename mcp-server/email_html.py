@@ -0,0 +1,28 @@
+# === File: email_html.py ===
+# HTML body for notification emails, shared by the unified server and the Gmail tool
+
+import string
+from html import escape
+
+# Parsed once; only subject, body and footer vary per send
+EMAIL_HTML_TEMPLATE = string.Template("""<html>
+<body>
+<h2>$subject</h2>
+<div style="font-family: Arial, sans-serif; line-height: 1.6;">
+$body
+</div>
+<hr>
+<p style="color: #666; font-size: 12px;">
+    $footer
+</p>
+</body>
+</html>
+""")
+
+def render_html(subject: str, message: str, footer: str) -> str:
+    """Render a notification email body, escaping the text so it cannot inject markup."""
+    return EMAIL_HTML_TEMPLATE.substitute(
+        subject=escape(subject),
+        body=escape(message).replace("\n", "<br>"),
+        footer=escape(footer),
+    )
@@ -0,0 +1,53 @@
+# === File: event_log.py ===
+# Helpers for the JSON Lines event log, shared by the unified server and the CI monitor tools
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+def read_last_lines(path: Path, count: int, chunk_size: int = 64 * 1024) -> List[bytes]:
+    """Return the last `count` non-empty lines of a file, reading backwards from the end.
+
+    An unterminated last line is left out: every append ends with a newline, so it
+    is either torn by a crash or still being written.
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        # Stop once more than `count` newlines are read, so any partial
+        # first line falls outside the slice below
+        while position > 0 and newlines <= count:
+            size = min(chunk_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    data = b"".join(reversed(chunks))
+    data = data[:data.rfind(b"\n") + 1]
+    lines = [line for line in data.splitlines() if line.strip()]
+    return lines[-count:] if count > 0 else []
+
+def load_last_events(path: Path, count: int, loads: Callable = json.loads) -> list:
+    """Decode the last `count` events of the log, skipping lines that are not valid JSON."""
+    events = []
+    for line in read_last_lines(path, count):
+        try:
+            events.append(loads(line))
+        except ValueError:
+            logger.warning("Skipping unreadable event log line in %s: %r", path, line[:200])
+    return events
+
+def terminate_partial_line(path: Path):
+    """End the file with a newline if its last line was torn, so later appends start cleanly."""
+    with open(path, 'rb+') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
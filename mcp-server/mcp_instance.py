@@ -3,32 +3,62 @@
 
 import os
 import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+import aiohttp
 from mcp.server.fastmcp import FastMCP
 
+logger = logging.getLogger(__name__)
+
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the HTTP session shared by the Slack tools, creating it on first use."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    return _http_session
+
+async def close_http_session():
+    """Close the shared HTTP session, if one was opened."""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Release the shared HTTP session when the MCP server shuts down."""
+    try:
+        yield
+    finally:
+        await close_http_session()
+
 # Initialize MCP server
-mcp = FastMCP("pr-agent-slack") 
+mcp = FastMCP("pr-agent-slack", lifespan=lifespan)
 
 # Slack notification hook
 async def send_slack_alert(message: str):
     """Send a Slack notification."""
-    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
-    if not webhook_url:
-        print("SLACK_WEBHOOK_URL not set.")
+    if not SLACK_WEBHOOK_URL:
+        logger.warning("SLACK_WEBHOOK_URL not set.")
         return
 
     try:
-        import requests
         payload = {
             "text": message,
             "mrkdwn": True
         }
-        response = requests.post(webhook_url, json=payload, timeout=10)
-        if response.status_code == 200:
-            print("Slack notification sent successfully.")
-        else:
-            print(f"Slack error: {response.status_code} - {response.text}")
+        async with get_http_session().post(SLACK_WEBHOOK_URL, json=payload) as response:
+            if response.status == 200:
+                logger.debug("Slack notification sent successfully.")
+            else:
+                logger.warning("Slack error: %s - %s", response.status, await response.text())
     except Exception as e:
-        print(f"Exception while sending Slack message: {e}")
+        logger.warning("Exception while sending Slack message: %s", e)
 
 def on_pr_analysis_complete(summary: str, pr_title: str, repo: str):
     """Hook called after PR analysis is complete."""
@@ -1,5 +1,6 @@
 # === File: tools/ci_monitor.py ===
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
@@ -7,13 +8,19 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from mcp_instance import mcp, on_ci_event_detected
+from event_log import load_last_events
+
+def _events_exist(path: Path) -> bool:
+    """Check for either the JSON Lines event log or the legacy JSON file."""
+    return path.with_suffix(".jsonl").exists() or path.exists()
 
 # Try multiple possible paths for the events file
 EVENTS_FILE = Path(__file__).parent.parent.parent / "webhook_server" / "github_events.json"
-if not EVENTS_FILE.exists():
+if not _events_exist(EVENTS_FILE):
     EVENTS_FILE = Path(__file__).parent.parent.parent / "github_events.json"
-if not EVENTS_FILE.exists():
+if not _events_exist(EVENTS_FILE):
     EVENTS_FILE = Path("github_events.json")
+EVENTS_LOG = EVENTS_FILE.with_suffix(".jsonl")
 
 # Define known workflows for this project
 KNOWN_WORKFLOWS = {
@@ -22,23 +29,32 @@ KNOWN_WORKFLOWS = {
     "Upload PR Documentation": "PR documentation upload to Hugging Face"
 }
 
+# The unified server keeps at most this many events
+MAX_EVENTS = 100
+
+def _load_events(limit: int = MAX_EVENTS) -> list:
+    """Load the most recent stored events, preferring the JSON Lines log written by the unified server.
+
+    Blocking; the tools call it through asyncio.to_thread.
+    """
+    if EVENTS_LOG.exists():
+        return load_last_events(EVENTS_LOG, limit)
+    if EVENTS_FILE.exists():
+        with open(EVENTS_FILE, 'r') as f:
+            return json.load(f)[-limit:]
+    return []
+
 @mcp.tool()
 async def get_recent_actions_events(limit: int = 10) -> str:
     """Get recent GitHub Actions events received via webhook."""
-    if not EVENTS_FILE.exists():
-        return json.dumps([])
-    with open(EVENTS_FILE, 'r') as f:
-        events = json.load(f)
+    events = await asyncio.to_thread(_load_events, limit if limit > 0 else MAX_EVENTS)
     recent = events[-limit:]
-    return json.dumps(recent, indent=2)
+    return json.dumps(recent, separators=(",", ":"))
 
 @mcp.tool()
 async def get_workflow_status(workflow_name: Optional[str] = None) -> str:
     """Get the current status of GitHub Actions workflows."""
-    if not EVENTS_FILE.exists():
-        return json.dumps({"message": "No GitHub Actions events received yet"})
-    with open(EVENTS_FILE, 'r') as f:
-        events = json.load(f)
+    events = await asyncio.to_thread(_load_events)
     if not events:
         return json.dumps({"message": "No GitHub Actions events received yet"})
 
@@ -66,15 +82,12 @@ async def get_workflow_status(workflow_name: Optional[str] = None) -> str:
                 repo = event.get("repository", "Unknown")
                 on_ci_event_detected("workflow_run", name, run.get("conclusion"), repo)
 
-    return json.dumps(list(workflows.values()), indent=2)
+    return json.dumps(list(workflows.values()), separators=(",", ":"))
 
 @mcp.tool()
 async def get_documentation_workflow_status() -> str:
     """Get the status of documentation-related workflows specifically."""
-    if not EVENTS_FILE.exists():
-        return json.dumps({"message": "No GitHub Actions events received yet"})
-    with open(EVENTS_FILE, 'r') as f:
-        events = json.load(f)
+    events = await asyncio.to_thread(_load_events)
     if not events:
         return json.dumps({"message": "No GitHub Actions events received yet"})
 
@@ -105,15 +118,12 @@ async def get_documentation_workflow_status() -> str:
                 repo = event.get("repository", "Unknown")
                 on_ci_event_detected("workflow_run", name, run.get("conclusion"), repo)
 
-    return json.dumps(list(workflows.values()), indent=2)
+    return json.dumps(list(workflows.values()), separators=(",", ":"))
 
 @mcp.tool()
 async def get_failed_workflows() -> str:
     """Get only failed workflows for quick troubleshooting."""
-    if not EVENTS_FILE.exists():
-        return json.dumps({"message": "No GitHub Actions events received yet"})
-    with open(EVENTS_FILE, 'r') as f:
-        events = json.load(f)
+    events = await asyncio.to_thread(_load_events)
     if not events:
         return json.dumps({"message": "No GitHub Actions events received yet"})
 
@@ -142,4 +152,4 @@ async def get_failed_workflows() -> str:
             repo = event.get("repository", "Unknown")
             on_ci_event_detected("workflow_run", name, "failure", repo)
 
-    return json.dumps(list(workflows.values()), indent=2)
+    return json.dumps(list(workflows.values()), separators=(",", ":"))
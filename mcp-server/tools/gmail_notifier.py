@@ -5,14 +5,20 @@ Sends emails via Gmail SMTP.
 """
 
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import aiosmtplib
+from email.message import EmailMessage
 from typing import Optional
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from email_html import render_html
 from mcp_instance import mcp
 
+GMAIL_USER = os.getenv("GMAIL_USER")
+GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
+DEFAULT_EMAIL_RECIPIENT = os.getenv("DEFAULT_EMAIL_RECIPIENT")
+
+EMAIL_FOOTER = "Sent by MCP-AutoPRX Server"
+
 @mcp.tool()
 async def send_gmail_notification(subject: str, message: str, recipient: str = None) -> str:
     """
@@ -26,57 +32,39 @@ async def send_gmail_notification(subject: str, message: str, recipient: str = N
     Returns:
         Status message indicating success or failure
     """
-    gmail_user = os.getenv("GMAIL_USER")
-    gmail_password = os.getenv("GMAIL_APP_PASSWORD")
-    default_recipient = os.getenv("DEFAULT_EMAIL_RECIPIENT")
-    
-    if not gmail_user or not gmail_password:
+    if not GMAIL_USER or not GMAIL_APP_PASSWORD:
         return "Error: GMAIL_USER and GMAIL_APP_PASSWORD environment variables not set"
     
-    recipient = recipient or default_recipient
+    recipient = recipient or DEFAULT_EMAIL_RECIPIENT
     if not recipient:
         return "Error: No recipient email specified and DEFAULT_EMAIL_RECIPIENT not set"
     
     try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = gmail_user
+        # Create message; EmailMessage avoids the MIMEMultipart wrapper and its extra part
+        msg = EmailMessage()
+        msg['From'] = GMAIL_USER
         msg['To'] = recipient
         msg['Subject'] = subject
         
-        # Create HTML body
-        html_body = f"""
-        <html>
-        <body>
-            <h2>{subject}</h2>
-            <div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                {message.replace(chr(10), '<br>')}
-            </div>
-            <hr style="margin: 20px 0; border: none; border-top: 1px solid #eee;">
-            <p style="color: #666; font-size: 12px; margin-top: 20px;">
-                Sent by MCP-AutoPRX Server
-            </p>
-        </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(html_body, 'html'))
+        msg.set_content(render_html(subject, message, EMAIL_FOOTER), subtype='html')
         
-        # Send email
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(gmail_user, gmail_password)
-        text = msg.as_string()
-        server.sendmail(gmail_user, recipient, text)
-        server.quit()
+        # Send email without blocking the event loop
+        await aiosmtplib.send(
+            msg,
+            hostname='smtp.gmail.com',
+            port=587,
+            start_tls=True,
+            username=GMAIL_USER,
+            password=GMAIL_APP_PASSWORD
+        )
         
         return f"Gmail notification sent successfully to {recipient}"
         
-    except smtplib.SMTPAuthenticationError:
+    except aiosmtplib.SMTPAuthenticationError:
         return "Error: Gmail authentication failed. Check GMAIL_USER and GMAIL_APP_PASSWORD"
-    except smtplib.SMTPRecipientsRefused:
+    except aiosmtplib.SMTPRecipientsRefused:
         return f"Error: Recipient email {recipient} was refused"
-    except smtplib.SMTPServerDisconnected:
+    except aiosmtplib.SMTPServerDisconnected:
         return "Error: Gmail server disconnected. Please try again"
     except Exception as e:
         return f"Error sending Gmail notification: {str(e)}"
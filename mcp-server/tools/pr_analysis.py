@@ -2,6 +2,7 @@
 
 import os
 import json
+import asyncio
 import subprocess
 from typing import Optional
 from pathlib import Path
@@ -21,8 +22,8 @@ DEFAULT_TEMPLATES = {
     "security.md": "Security"
 }
 
-@mcp.tool()
-async def analyze_file_changes(base_branch: str = "main", include_diff: bool = True, max_diff_lines: int = 500, working_directory: Optional[str] = None) -> str:
+def _analyze_file_changes(base_branch: str, include_diff: bool, max_diff_lines: int, working_directory: Optional[str]) -> str:
+    """Run the git commands behind analyze_file_changes; blocking, so called via asyncio.to_thread."""
     try:
         cwd = working_directory or os.getcwd()
 
@@ -67,7 +68,11 @@ async def analyze_file_changes(base_branch: str = "main", include_diff: bool = T
         return json.dumps({"error": str(e)})
 
 @mcp.tool()
-async def get_pr_templates() -> str:
+async def analyze_file_changes(base_branch: str = "main", include_diff: bool = True, max_diff_lines: int = 500, working_directory: Optional[str] = None) -> str:
+    return await asyncio.to_thread(_analyze_file_changes, base_branch, include_diff, max_diff_lines, working_directory)
+
+def _read_templates() -> str:
+    """Read the PR template files; blocking, so called via asyncio.to_thread."""
     templates = []
     for filename, template_type in DEFAULT_TEMPLATES.items():
         template_path = TEMPLATES_DIR / filename
@@ -86,3 +91,7 @@ async def get_pr_templates() -> str:
         })
     
     return json.dumps(templates, indent=2)
+
+@mcp.tool()
+async def get_pr_templates() -> str:
+    return await asyncio.to_thread(_read_templates)
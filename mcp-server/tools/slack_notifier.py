@@ -1,31 +1,32 @@
 # === File: tools/slack_notifier.py ===
 
 import os
-import requests
+import asyncio
+import aiohttp
 import sys
-import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from mcp_instance import mcp
+from mcp_instance import mcp, get_http_session
+
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
 @mcp.tool()
 async def send_slack_notification(message: str) -> str:
     """Send a formatted notification to the team Slack channel."""
-    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
-    if not webhook_url:
+    if not SLACK_WEBHOOK_URL:
         return "Error: SLACK_WEBHOOK_URL environment variable not set"
     try:
         payload = {
             "text": message,
             "mrkdwn": True
         }
-        response = requests.post(webhook_url, json=payload, timeout=10)
-        if response.status_code == 200:
-            return "Message sent successfully to Slack"
-        else:
-            return f"Failed to send message. Status: {response.status_code}, Response: {response.text}"
-    except requests.exceptions.Timeout:
+        async with get_http_session().post(SLACK_WEBHOOK_URL, json=payload) as response:
+            if response.status == 200:
+                return "Message sent successfully to Slack"
+            else:
+                return f"Failed to send message. Status: {response.status}, Response: {await response.text()}"
+    except asyncio.TimeoutError:
         return "Request timed out. Check your internet connection and try again."
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         return "Connection error. Check your internet connection and webhook URL."
     except Exception as e:
         return f"Error sending message: {str(e)}"
@@ -64,6 +64,18 @@ class TestGetRecentActionsEvents:
         # Should return a list (even if empty)
         assert isinstance(data, list), "Should return a list"
 
+    
+    @pytest.mark.asyncio
+    async def test_skips_torn_final_line(self, tmp_path, monkeypatch):
+        """Test that a truncated last line in the event log is skipped rather than raising."""
+        from tools import ci_monitor
+        log = tmp_path / "github_events.jsonl"
+        log.write_bytes(b'{"event_type": "push"}\n{"event_type": "wor')
+        monkeypatch.setattr(ci_monitor, "EVENTS_LOG", log)
+        
+        result = await get_recent_actions_events()
+        
+        assert json.loads(result) == [{"event_type": "push"}]
 
 @pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
 class TestGetWorkflowStatus:
@@ -67,6 +67,21 @@ class TestAnalyzeFileChanges:
             assert any(key in data for key in ["files_changed", "files", "changes", "diff"]), \
                 "Result should include file change information"
 
+    
+    @pytest.mark.asyncio
+    async def test_git_runs_off_event_loop_thread(self):
+        """Test that the blocking git calls run in a worker thread."""
+        import threading
+        threads = set()
+        
+        def fake_run(*args, **kwargs):
+            threads.add(threading.current_thread())
+            return MagicMock(stdout="", stderr="")
+        
+        with patch('subprocess.run', side_effect=fake_run):
+            await analyze_file_changes()
+        
+        assert threads and threading.main_thread() not in threads
 
 @pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
 class TestGetPRTemplates:
@@ -5,9 +5,9 @@ import json
 import tempfile
 import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
-import requests
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 import subprocess
+import msgspec
 
 # Adjust the path to import unified_server.py and tools from mcp-server
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -19,6 +19,14 @@ import unified_server
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'mcp-server')))
 from tools import pr_analysis, ci_monitor, slack_notifier
 from prompts import pr_prompts, ci_prompts, review_prompts
+from event_log import load_last_events
+
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run each test in a temporary directory so the server's event log and payloads stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
 
 
 class TestUnifiedServer:
@@ -93,4 +101,1030 @@ class TestToolFunctions:
         events = json.loads(result)
         
         assert isinstance(events, list)
-        # Should return empty list if no events file exists 
\ No newline at end of file
+        # Should return empty list if no events file exists 
+
+class TestGmailMessage:
+    """Test Gmail message construction in the unified server."""
+    
+    def _sent_message(self, mock_send):
+        """Parse the raw bytes handed to _send_pooled_email."""
+        import email
+        import email.policy
+        return email.message_from_bytes(mock_send.call_args[0][2], policy=email.policy.default)
+    
+    @pytest.mark.asyncio
+    async def test_sends_plain_and_html_alternatives(self, monkeypatch):
+        """Test that send_gmail_message sends a multipart/alternative message."""
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        server = unified_server.UnifiedServer()
+        
+        with patch.object(server, '_send_pooled_email', new_callable=AsyncMock) as mock_send:
+            result = await server.send_gmail_message("CI Alert", "line one\nline two", "dev@example.com")
+        
+        assert "successfully" in result
+        assert mock_send.call_args[0][:2] == ("bot@example.com", ["dev@example.com"])
+        msg = self._sent_message(mock_send)
+        assert msg['To'] == "dev@example.com"
+        assert msg['Subject'] == "CI Alert"
+        assert msg.get_body(preferencelist=('plain',)).get_content() == "line one\nline two"
+        assert msg.get_content_type() == "multipart/alternative"
+        html_part = msg.get_body(preferencelist=('html',))
+        assert "line one<br>line two" in html_part.get_content()
+        assert "<h2>CI Alert</h2>" in html_part.get_content()
+    
+    @pytest.mark.asyncio
+    async def test_escapes_html_in_subject_and_body(self, monkeypatch):
+        """Test that markup in notification text is escaped in the HTML part."""
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        server = unified_server.UnifiedServer()
+        
+        with patch.object(server, '_send_pooled_email', new_callable=AsyncMock) as mock_send:
+            await server.send_gmail_message("<b>x</b>", "<script>alert(1)</script>", "dev@example.com")
+        
+        html = self._sent_message(mock_send).get_body(preferencelist=('html',)).get_content()
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+        assert "<h2>&lt;b&gt;x&lt;/b&gt;</h2>" in html
+    
+    @pytest.mark.asyncio
+    async def test_headers_encoded_and_newlines_stripped(self, monkeypatch):
+        """Test that non-ASCII subjects are encoded and CR/LF cannot inject headers."""
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        server = unified_server.UnifiedServer()
+        
+        with patch.object(server, '_send_pooled_email', new_callable=AsyncMock) as mock_send:
+            await server.send_gmail_message("Échec\r\nBcc: evil@example.com", "x" * 2000, "dev@example.com")
+        
+        raw = mock_send.call_args[0][2]
+        msg = self._sent_message(mock_send)
+        assert msg['Subject'] == "Échec Bcc: evil@example.com"
+        assert msg['Bcc'] is None
+        assert max(len(line) for line in raw.split(b"\r\n")) <= 998
+        assert msg.get_body(preferencelist=('plain',)).get_content() == "x" * 2000
+    
+    @pytest.mark.asyncio
+    async def test_long_non_ascii_subject_folded_with_crlf(self, monkeypatch):
+        """Test that a folded encoded subject uses CRLF line endings and decodes intact."""
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        server = unified_server.UnifiedServer()
+        subject = " ".join(["Échec du déploiement"] * 8)
+        
+        with patch.object(server, '_send_pooled_email', new_callable=AsyncMock) as mock_send:
+            await server.send_gmail_message(subject, "body", "dev@example.com")
+        
+        raw = mock_send.call_args[0][2]
+        header = raw.split(b"\r\nMIME-Version")[0].split(b"Subject: ", 1)[1]
+        assert b"\r\n " in header
+        assert b"\n" not in raw.replace(b"\r\n", b"")
+        assert self._sent_message(mock_send)['Subject'] == subject
+    
+    def _fake_smtp(self, clients):
+        """Return a stand-in for aiosmtplib.SMTP that records each client it opens."""
+        def factory(**kwargs):
+            client = MagicMock(is_connected=True)
+            client.connect = AsyncMock()
+            client.sendmail = AsyncMock()
+            client.noop = AsyncMock()
+            client.quit = AsyncMock()
+            clients.append(client)
+            return client
+        return factory
+    
+    @pytest.mark.asyncio
+    async def test_reuses_pooled_connection(self, monkeypatch):
+        """Test that consecutive sends share one SMTP connection until it is recycled."""
+        monkeypatch.setattr(unified_server, 'SMTP_MAX_MESSAGES_PER_CONNECTION', 2)
+        server = unified_server.UnifiedServer()
+        clients = []
+        
+        with patch('unified_server.aiosmtplib.SMTP', side_effect=self._fake_smtp(clients)):
+            for _ in range(3):
+                await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+        
+        assert len(clients) == 2
+        assert clients[0].sendmail.await_count == 2
+        clients[0].close.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect(self):
+        """Test that a dropped pooled connection is replaced and the send retried."""
+        import aiosmtplib
+        server = unified_server.UnifiedServer()
+        clients = []
+        
+        with patch('unified_server.aiosmtplib.SMTP', side_effect=self._fake_smtp(clients)):
+            await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+            clients[0].sendmail.side_effect = aiosmtplib.SMTPServerDisconnected("idle")
+            await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+        
+        assert len(clients) == 2
+        assert clients[1].sendmail.await_count == 1
+        assert server._smtp_pool.qsize() == unified_server.SMTP_POOL_SIZE
+    
+    @pytest.mark.asyncio
+    async def test_idle_connection_health_checked(self, monkeypatch):
+        """Test that a connection idle past the threshold is NOOP-checked and replaced if dead."""
+        import aiosmtplib
+        monkeypatch.setattr(unified_server, 'SMTP_IDLE_CHECK_SECONDS', -1)
+        server = unified_server.UnifiedServer()
+        clients = []
+        
+        with patch('unified_server.aiosmtplib.SMTP', side_effect=self._fake_smtp(clients)):
+            await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+            clients[0].noop.side_effect = aiosmtplib.SMTPServerDisconnected("idle")
+            await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+        
+        clients[0].noop.assert_awaited_once()
+        assert len(clients) == 2
+        assert clients[1].sendmail.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_shutdown_quits_pooled_connections(self):
+        """Test that closing the pool sends QUIT on open connections."""
+        server = unified_server.UnifiedServer()
+        clients = []
+        
+        with patch('unified_server.aiosmtplib.SMTP', side_effect=self._fake_smtp(clients)):
+            await server._send_pooled_email("bot@example.com", ["dev@example.com"], b"raw")
+        await server._close_smtp_pool()
+        
+        clients[0].quit.assert_awaited_once()
+        assert server._smtp_pool.qsize() == unified_server.SMTP_POOL_SIZE
+
+
+class TestEventNotifications:
+    """Test notification routing for GitHub events."""
+    
+    @pytest.mark.asyncio
+    async def test_skips_disabled_channels(self, monkeypatch):
+        """Test that unconfigured Slack/Gmail channels are never called."""
+        for var in ("SLACK_WEBHOOK_URL", "GMAIL_USER", "GMAIL_APP_PASSWORD", "DEFAULT_EMAIL_RECIPIENT"):
+            monkeypatch.delenv(var, raising=False)
+        server = unified_server.UnifiedServer()
+        assert not server.slack_enabled
+        assert not server.gmail_enabled
+        
+        with patch.object(server, 'send_slack_message') as mock_slack, \
+             patch.object(server, 'send_gmail_message') as mock_gmail:
+            await server.process_event_notifications(
+                "workflow_run",
+                unified_server.GitHubEvent(
+                    workflow_run=unified_server.WorkflowRun(name="CI", conclusion="failure"),
+                    repository=unified_server.Repository(full_name="o/r")
+                )
+            )
+        
+        mock_slack.assert_not_called()
+        mock_gmail.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_coalesces_queued_notifications(self, monkeypatch):
+        """Test that queued events go out as one Slack post and one email."""
+        monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        monkeypatch.setenv("DEFAULT_EMAIL_RECIPIENT", "dev@example.com")
+        server = unified_server.UnifiedServer()
+        
+        for conclusion in ("failure", "success"):
+            await server.process_event_notifications(
+                "workflow_run",
+                unified_server.GitHubEvent(workflow_run=unified_server.WorkflowRun(name="CI", conclusion=conclusion))
+            )
+        
+        with patch.object(server, 'send_slack_message', new_callable=AsyncMock) as mock_slack, \
+             patch.object(server, 'send_gmail_message', new_callable=AsyncMock) as mock_gmail:
+            await server.flush_notifications()
+        
+        mock_slack.assert_awaited_once()
+        assert "\n---\n" in mock_slack.call_args[0][0]
+        mock_gmail.assert_awaited_once()
+        assert mock_gmail.call_args[0][0] == "MCP-AutoPRX: 2 CI notifications"
+        assert server._slack_batch == [] and server._workflow_batch == {}
+    
+    @pytest.mark.asyncio
+    async def test_groups_runs_by_repo_and_conclusion(self, monkeypatch):
+        """Test that runs sharing a repo and conclusion render as one Slack message and one email."""
+        monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+        monkeypatch.setenv("GMAIL_USER", "bot@example.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        monkeypatch.setenv("DEFAULT_EMAIL_RECIPIENT", "dev@example.com")
+        server = unified_server.UnifiedServer()
+        
+        for name in ("lint", "test-py310", "test-py311"):
+            await server.process_event_notifications(
+                "workflow_run",
+                unified_server.GitHubEvent(
+                    workflow_run=unified_server.WorkflowRun(name=name, conclusion="failure"),
+                    repository=unified_server.Repository(full_name="o/r")
+                )
+            )
+        
+        with patch.object(server, 'send_slack_message', new_callable=AsyncMock) as mock_slack, \
+             patch.object(server, 'send_gmail_message', new_callable=AsyncMock) as mock_gmail:
+            await server.flush_notifications()
+        
+        slack_text = mock_slack.call_args[0][0]
+        assert slack_text.startswith("CI Failure Alert - 3 workflows in o/r:")
+        assert "---" not in slack_text
+        subject, body = mock_gmail.call_args[0]
+        assert subject == "CI Failure Alert - o/r (3 workflows)"
+        assert "test-py311" in body
+
+
+class TestStoreEvent:
+    """Test GitHub event storage."""
+    
+    def _logged_events(self):
+        return [json.loads(line) for line in unified_server.read_last_lines(unified_server.EVENTS_LOG, 100)]
+    
+    def _pending_events(self, server):
+        return [json.loads(line) for line in server._pending_lines]
+    
+    @pytest.mark.asyncio
+    async def test_stores_summary_and_gzipped_payload(self, tmp_path, monkeypatch):
+        """Test that the event log holds a summary and the payload is written separately."""
+        import asyncio
+        import gzip
+        server = unified_server.UnifiedServer()
+        raw = json.dumps({
+            "repository": {"full_name": "o/r"},
+            "sender": {"login": "dev"},
+            "workflow_run": {"name": "CI", "conclusion": "success", "run_number": 7, "jobs_url": "https://x"},
+            "commits": [{"id": "abc"}]
+        }).encode()
+        event = msgspec.json.decode(raw, type=unified_server.GitHubEvent)
+        
+        await server.store_event("workflow_run", event, raw)
+        await asyncio.gather(*server._background_tasks)
+        await server.flush_events()
+        
+        with open(unified_server.EVENTS_LOG) as f:
+            events = [json.loads(line) for line in f]
+        assert len(events) == 1
+        assert "data" not in events[0]
+        assert events[0]["repository"] == "o/r"
+        assert events[0]["workflow_run"]["run_number"] == 7
+        assert "jobs_url" not in events[0]["workflow_run"]
+        with gzip.open(events[0]["payload"], 'rb') as f:
+            assert f.read() == raw
+    
+    @pytest.mark.asyncio
+    async def test_burst_shares_timestamp_but_not_payload_file(self, tmp_path, monkeypatch):
+        """Test that events within one clock refresh share a timestamp yet get distinct payload files."""
+        import asyncio
+        import gzip
+        monkeypatch.setattr(unified_server, 'CLOCK_REFRESH_INTERVAL', 60)
+        server = unified_server.UnifiedServer()
+        
+        for n in range(2):
+            raw = json.dumps({"action": str(n)}).encode()
+            await server.store_event("push", msgspec.json.decode(raw, type=unified_server.GitHubEvent), raw)
+        await asyncio.gather(*server._background_tasks)
+        
+        first, second = self._pending_events(server)
+        assert first["timestamp"] == second["timestamp"]
+        assert first["payload"] != second["payload"]
+        with gzip.open(second["payload"], 'rb') as f:
+            assert json.loads(f.read()) == {"action": "1"}
+    
+    @pytest.mark.asyncio
+    async def test_payload_archived_after_store_returns(self, tmp_path, monkeypatch):
+        """Test that store_event does not wait for the payload file to be written."""
+        import asyncio
+        import threading
+        server = unified_server.UnifiedServer()
+        release = threading.Event()
+        written = []
+        monkeypatch.setattr(server, '_write_payload', lambda path, raw: (release.wait(5), written.append(path)))
+        raw = b'{"action": "opened"}'
+        
+        await server.store_event("push", msgspec.json.decode(raw, type=unified_server.GitHubEvent), raw)
+        
+        assert len(server._pending_lines) == 1 and not written
+        release.set()
+        await asyncio.gather(*server._background_tasks)
+        assert written == [Path(self._pending_events(server)[0]["payload"])]
+    
+    @pytest.mark.asyncio
+    async def test_compaction_trims_log(self, tmp_path, monkeypatch):
+        """Test that compaction rewrites the log with only the most recent events."""
+        monkeypatch.setattr(unified_server, 'MAX_STORED_EVENTS', 3)
+        server = unified_server.UnifiedServer()
+        
+        for i in range(5):
+            await server.store_event("push", unified_server.GitHubEvent(ref=f"refs/heads/b{i}"), b"{}")
+        await server.compact_events()
+        
+        events = self._logged_events()
+        assert [e["event_type"] for e in events] == ["push"] * 3
+    
+    @pytest.mark.asyncio
+    async def test_compaction_prunes_archived_payloads(self, tmp_path, monkeypatch):
+        """Test that compaction keeps only the newest MAX_STORED_EVENTS payload files."""
+        import asyncio
+        monkeypatch.setattr(unified_server, 'MAX_STORED_EVENTS', 2)
+        server = unified_server.UnifiedServer()
+        
+        for i in range(4):
+            await server.store_event("push", unified_server.GitHubEvent(ref=f"refs/heads/b{i}"), b"{}")
+        await asyncio.gather(*server._background_tasks)
+        await server.compact_events()
+        
+        remaining = sorted(str(p) for p in unified_server.PAYLOADS_DIR.rglob("*.json.gz"))
+        assert remaining == sorted(e["payload"] for e in self._logged_events())
+    
+    def test_migrates_legacy_json_file(self, tmp_path, monkeypatch):
+        """Test that events from the legacy JSON file are moved to the log when no log exists."""
+        with open(unified_server.EVENTS_FILE, 'w') as f:
+            json.dump([{"event_type": "ping"}], f)
+        
+        unified_server.UnifiedServer()
+        
+        assert self._logged_events() == [{"event_type": "ping"}]
+    
+    @pytest.mark.asyncio
+    async def test_torn_final_line_skipped_on_startup(self, tmp_path, monkeypatch):
+        """Test that later appends after a log truncated mid-append stay readable."""
+        with open(unified_server.EVENTS_LOG, 'wb') as f:
+            f.write(b'{"event_type": "push"}\n{"event_type": "wor')
+        
+        server = unified_server.UnifiedServer()
+        await server.store_event("ping", unified_server.GitHubEvent(), b"{}")
+        await server.flush_events()
+        
+        events = load_last_events(unified_server.EVENTS_LOG, 10)
+        assert [e["event_type"] for e in events] == ["push", "ping"]
+    
+    def test_read_last_lines_across_chunks(self, tmp_path):
+        """Test that the tail reader returns whole lines when reading in small chunks."""
+        path = tmp_path / "events.jsonl"
+        path.write_bytes(b"".join(f'{{"n":{i}}}\n'.encode() for i in range(50)))
+        
+        lines = unified_server.read_last_lines(path, 3, chunk_size=7)
+        
+        assert [json.loads(line)["n"] for line in lines] == [47, 48, 49]
+        assert len(unified_server.read_last_lines(path, 500)) == 50
+    
+    def test_read_last_lines_leaves_out_torn_last_line(self, tmp_path):
+        """Test that an unterminated last line does not take the place of a complete one."""
+        path = tmp_path / "events.jsonl"
+        path.write_bytes(b'{"n":0}\n{"n":1}\n{"n":2}\n{"n":')
+        
+        lines = unified_server.read_last_lines(path, 2, chunk_size=5)
+        
+        assert [json.loads(line)["n"] for line in lines] == [1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_buffered_lines_written_once(self, tmp_path, monkeypatch):
+        """Test that compaction and a later flush never duplicate buffered events."""
+        server = unified_server.UnifiedServer()
+        
+        await server.store_event("push", unified_server.GitHubEvent(ref="refs/heads/a"), b"{}")
+        await server.flush_events()
+        await server.store_event("push", unified_server.GitHubEvent(ref="refs/heads/b"), b"{}")
+        await server.compact_events()
+        await server.flush_events()
+        
+        assert len(unified_server.read_last_lines(unified_server.EVENTS_LOG, 10)) == 2
+    
+    @pytest.mark.asyncio
+    async def test_compaction_keeps_other_workers_events(self, tmp_path, monkeypatch):
+        """Test that compaction trims the shared log on disk, not only this process's events."""
+        server = unified_server.UnifiedServer()
+        
+        await server.store_event("push", unified_server.GitHubEvent(ref="refs/heads/a"), b"{}")
+        await server.flush_events()
+        with open(unified_server.EVENTS_LOG, 'ab') as f:
+            f.write(b'{"event_type":"ping"}\n')
+        await server.store_event("push", unified_server.GitHubEvent(ref="refs/heads/b"), b"{}")
+        await server.compact_events()
+        
+        lines = unified_server.read_last_lines(unified_server.EVENTS_LOG, 10)
+        assert [json.loads(line)["event_type"] for line in lines] == ["push", "ping", "push"]
+
+
+class TestCallTool:
+    """Test the direct /call/{tool_name} endpoint."""
+    
+    def test_dispatches_registered_tool(self, monkeypatch):
+        """Test that /call routes to the tool registered under that name."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        response = client.post(
+            "/call/suggest_template",
+            json={"arguments": {"changes_summary": "Fix crash on startup", "change_type": "bug"}},
+            headers={"x-api-key": "test-key"}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["tool"] == "suggest_template"
+    
+    def test_unknown_tool_returns_404(self, monkeypatch):
+        """Test that unknown tool names are rejected."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        response = client.post("/call/no_such_tool", json={}, headers={"x-api-key": "test-key"})
+        
+        assert response.status_code == 404
+    
+    def test_jsonrpc_tools_call_uses_dispatch_table(self, monkeypatch):
+        """Test that MCP tools/call requests route through the same table."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        response = client.post(
+            "/mcp",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                  "params": {"name": "suggest_template", "arguments": {"changes_summary": "Fix crash"}}},
+            headers={"x-api-key": "test-key"}
+        )
+        
+        assert response.json()["result"]["content"][0]["type"] == "text"
+    
+    def test_jsonrpc_malformed_body_returns_parse_error(self, monkeypatch):
+        """Test that an unparseable MCP request body yields a JSON-RPC error response."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        response = client.post(
+            "/mcp", content=b"{not json", headers={"x-api-key": "test-key", "content-type": "application/json"}
+        )
+        
+        data = response.json()
+        assert data["id"] is None
+        assert data["error"]["code"] == -32603
+    
+    def test_slack_tool_uses_shared_session_sender(self, monkeypatch):
+        """Test that the Slack tool goes through the server's async sender."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        with patch.object(server, 'send_slack_message', new_callable=AsyncMock, return_value="sent") as mock_slack:
+            response = client.post(
+                "/call/send_slack_notification",
+                json={"arguments": {"message": "hi"}},
+                headers={"x-api-key": "test-key"}
+            )
+        
+        mock_slack.assert_awaited_once_with("hi")
+        assert response.json()["result"] == "sent"
+    
+    def test_unconfigured_notification_tools_not_registered(self, monkeypatch):
+        """Test that Slack/Gmail tools are hidden when their credentials are missing."""
+        from fastapi.testclient import TestClient
+        for var in ("SLACK_WEBHOOK_URL", "GMAIL_USER", "GMAIL_APP_PASSWORD"):
+            monkeypatch.delenv(var, raising=False)
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        response = client.post(
+            "/mcp",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+            headers={"x-api-key": "test-key"}
+        )
+        
+        names = {tool["name"] for tool in response.json()["result"]["tools"]}
+        assert "send_slack_notification" not in names
+        assert "send_gmail_notification" not in names
+        assert "analyze_file_changes" in names
+        assert client.post(
+            "/call/send_slack_notification", json={"arguments": {"message": "hi"}}, headers={"x-api-key": "test-key"}
+        ).status_code == 404
+
+
+class TestGitHubWebhook:
+    """Test the GitHub webhook endpoint."""
+    
+    def _client(self, tmp_path, monkeypatch, secret="hook-secret"):
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("GITHUB_WEBHOOK_SECRET", secret)
+        return TestClient(unified_server.UnifiedServer().app)
+    
+    def _sign(self, body: bytes, secret="hook-secret") -> str:
+        import hmac
+        import hashlib
+        return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    
+    def test_accepts_signed_json_payload(self, tmp_path, monkeypatch):
+        """Test that a correctly signed JSON payload is processed."""
+        client = self._client(tmp_path, monkeypatch)
+        body = json.dumps({"zen": "Keep it simple", "repository": {"full_name": "o/r"}}).encode()
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/json",
+            "x-github-event": "ping",
+            "x-hub-signature-256": self._sign(body),
+        })
+        
+        assert response.status_code == 200
+        assert response.json()["event_type"] == "ping"
+    
+    def test_accepts_form_encoded_payload(self, tmp_path, monkeypatch):
+        """Test that a form-encoded payload is parsed from the signed body."""
+        from urllib.parse import urlencode
+        client = self._client(tmp_path, monkeypatch)
+        body = urlencode({"payload": json.dumps({"repository": {"full_name": "o/r"}})}).encode()
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/x-www-form-urlencoded",
+            "x-github-event": "ping",
+            "x-hub-signature-256": self._sign(body),
+        })
+        
+        assert response.json() == {"status": "received", "event_type": "ping"}
+    
+    def test_accepts_form_encoded_non_ascii_payload(self, tmp_path, monkeypatch):
+        """Test that percent-encoded UTF-8 in a form payload is decoded intact."""
+        from urllib.parse import urlencode
+        client = self._client(tmp_path, monkeypatch)
+        payload = {"repository": {"full_name": "o/r"}, "sender": {"login": "jürgen"}, "ref": "refs/heads/café"}
+        body = urlencode({"payload": json.dumps(payload, ensure_ascii=False)}).encode()
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/x-www-form-urlencoded",
+            "x-github-event": "push",
+            "x-hub-signature-256": self._sign(body),
+        })
+        
+        assert response.json() == {"status": "received", "event_type": "push"}
+        assert unified_server.form_payload(body).decode() == json.dumps(payload, ensure_ascii=False)
+    
+    def test_parses_by_media_type_and_sniffs_unknown_types(self, tmp_path, monkeypatch):
+        """Test that content-type parameters are ignored and unknown types are routed by the body."""
+        from urllib.parse import urlencode
+        client = self._client(tmp_path, monkeypatch)
+        json_body = json.dumps({"repository": {"full_name": "o/r"}}).encode()
+        form_body = urlencode({"payload": json_body.decode()}).encode()
+        
+        for content_type, body in [
+            ("Application/JSON; charset=utf-8", json_body),
+            ("text/plain", json_body),
+            ("text/plain", form_body),
+        ]:
+            response = client.post("/webhook/github", content=body, headers={
+                "content-type": content_type,
+                "x-github-event": "ping",
+                "x-hub-signature-256": self._sign(body),
+            })
+            assert response.json() == {"status": "received", "event_type": "ping"}, content_type
+    
+    def test_rejects_path_traversal_in_event_header(self, tmp_path, monkeypatch):
+        """Test that an X-GitHub-Event header cannot steer the payload file outside payloads/."""
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        client = self._client(work_dir, monkeypatch)
+        body = b'{"zen": "Keep it simple"}'
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/json",
+            "x-github-event": "../../../../../../escaped",
+            "x-hub-signature-256": self._sign(body),
+        })
+        
+        assert response.json()["status"] == "error"
+        assert not list(tmp_path.rglob("*escaped*"))
+    
+    def test_rejects_bad_signature(self, tmp_path, monkeypatch):
+        """Test that a payload with a wrong signature is rejected."""
+        client = self._client(tmp_path, monkeypatch)
+        body = b'{"zen": "Keep it simple"}'
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/json",
+            "x-github-event": "ping",
+            "x-hub-signature-256": self._sign(body, secret="wrong"),
+        })
+        
+        assert response.status_code != 200
+    
+    def test_ignores_redelivered_event(self, tmp_path, monkeypatch):
+        """Test that a repeated X-GitHub-Delivery ID is acknowledged but not reprocessed."""
+        client = self._client(tmp_path, monkeypatch)
+        body = b'{"zen": "Keep it simple"}'
+        headers = {
+            "content-type": "application/json",
+            "x-github-event": "ping",
+            "x-github-delivery": "delivery-redelivered",
+            "x-hub-signature-256": self._sign(body),
+        }
+        
+        first = client.post("/webhook/github", content=body, headers=headers)
+        second = client.post("/webhook/github", content=body, headers=headers)
+        
+        assert first.json()["status"] == "received"
+        assert second.json()["status"] == "duplicate"
+    
+    def test_rejects_payload_with_wrong_field_types(self, tmp_path, monkeypatch):
+        """Test that payloads not matching the GitHubEvent schema are rejected."""
+        client = self._client(tmp_path, monkeypatch)
+        body = b'{"workflow_run": {"run_number": "not-a-number"}}'
+        
+        response = client.post("/webhook/github", content=body, headers={
+            "content-type": "application/json",
+            "x-github-event": "workflow_run",
+            "x-hub-signature-256": self._sign(body),
+        })
+        
+        assert response.json()["status"] == "error"
+    
+    def test_error_traceback_logged_only_at_debug(self, tmp_path, monkeypatch, caplog):
+        """Test that webhook errors log a traceback only when DEBUG logging is enabled."""
+        import logging
+        monkeypatch.delenv("GITHUB_WEBHOOK_SECRET", raising=False)
+        from fastapi.testclient import TestClient
+        server = unified_server.UnifiedServer()
+        client = TestClient(server.app)
+        
+        with patch.object(server, 'handle_github_delivery', new_callable=AsyncMock, side_effect=RuntimeError("boom")):
+            for level in (logging.INFO, logging.DEBUG):
+                caplog.clear()
+                with caplog.at_level(level, logger="mcp_autoprx"):
+                    response = client.post("/webhook/github", content=b"{}", headers={"content-type": "application/json"})
+                assert response.status_code == 400
+                [record] = [r for r in caplog.records if r.getMessage() == "Error processing webhook: boom"]
+                assert bool(record.exc_info) is (level == logging.DEBUG)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_redelivery_shares_result(self, tmp_path, monkeypatch):
+        """Test that a redelivery arriving mid-processing waits for the first result."""
+        import asyncio
+        import httpx
+        monkeypatch.delenv("GITHUB_WEBHOOK_SECRET", raising=False)
+        server = unified_server.UnifiedServer()
+        release = asyncio.Event()
+        calls = []
+        
+        async def slow_delivery(headers, body):
+            calls.append(body)
+            await release.wait()
+            return {"status": "received", "event_type": "ping"}
+        
+        monkeypatch.setattr(server, "handle_github_delivery", slow_delivery)
+        headers = {"x-github-delivery": "single-flight-1", "content-type": "application/json"}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/webhook/github", content=b"{}", headers=headers))
+            second = asyncio.create_task(client.post("/webhook/github", content=b"{}", headers=headers))
+            await asyncio.sleep(0.05)
+            release.set()
+            responses = await asyncio.gather(first, second)
+        
+        assert len(calls) == 1
+        assert [r.json() for r in responses] == [{"status": "received", "event_type": "ping"}] * 2
+    
+    def test_failed_delivery_can_be_retried(self, tmp_path, monkeypatch):
+        """Test that a delivery that errored is processed again when GitHub retries it."""
+        client = self._client(tmp_path, monkeypatch, secret="")
+        headers = {"x-github-delivery": "single-flight-2", "content-type": "application/json"}
+        
+        with patch.object(unified_server.UnifiedServer, "store_event", side_effect=OSError("disk full")):
+            assert client.post("/webhook/github", content=b"{}", headers=headers).status_code == 400
+        
+        assert client.post("/webhook/github", content=b"{}", headers=headers).json()["status"] == "received"
+
+
+class TestSlackMessage:
+    """Test Slack delivery from the unified server."""
+    
+    @pytest.mark.asyncio
+    async def test_posts_through_shared_session(self, monkeypatch):
+        """Test that send_slack_message posts the payload to the webhook URL."""
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        received = []
+        
+        async def hook(request):
+            assert request.content_type == "application/json"
+            received.append(await request.json())
+            return web.Response(text="ok")
+        
+        app = web.Application()
+        app.router.add_post("/hook", hook)
+        async with TestServer(app) as slack:
+            monkeypatch.setenv("SLACK_WEBHOOK_URL", str(slack.make_url("/hook")))
+            server = unified_server.UnifiedServer()
+            try:
+                result = await server.send_slack_message("Build passed")
+            finally:
+                await server._http.close()
+        
+        assert result == "Slack message sent successfully"
+        assert received == [{"text": "Build passed", "mrkdwn": True}]
+    
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors_only(self, monkeypatch):
+        """Test that 5xx responses are retried while other 4xx responses fail fast."""
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        monkeypatch.setattr(unified_server, 'SLACK_RETRY_BASE_DELAY', 0)
+        statuses = [503, 200, 400]
+        calls = []
+        
+        async def hook(request):
+            calls.append(request.path)
+            return web.Response(status=statuses[len(calls) - 1])
+        
+        app = web.Application()
+        app.router.add_post("/hook", hook)
+        async with TestServer(app) as slack:
+            monkeypatch.setenv("SLACK_WEBHOOK_URL", str(slack.make_url("/hook")))
+            server = unified_server.UnifiedServer()
+            try:
+                first = await server.send_slack_message("Build passed")
+                second = await server.send_slack_message("Build passed")
+            finally:
+                await server._http.close()
+        
+        assert first == "Slack message sent successfully"
+        assert second == "Slack error: 400"
+        assert len(calls) == 3
+
+
+class TestSettings:
+    """Test environment settings caching."""
+    
+    def test_settings_read_once_at_startup(self, monkeypatch):
+        """Test that settings reflect the environment at construction time only."""
+        monkeypatch.setenv("MCP_API_KEY", " test-key \n")
+        server = unified_server.UnifiedServer()
+        monkeypatch.setenv("MCP_API_KEY", "changed")
+        
+        assert server.settings.mcp_api_key == "test-key"
+        assert server._is_valid_api_key("test-key")
+        assert not server._is_valid_api_key("changed")
+        assert not server._is_valid_api_key(None)
+    
+    def test_runtime_options_parsed_once(self, monkeypatch):
+        """Test that PORT, LOG_LEVEL and WEB_CONCURRENCY are converted at startup."""
+        monkeypatch.setenv("PORT", "9090")
+        monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        
+        settings = unified_server.Settings.from_env()
+        
+        assert (settings.port, settings.log_level, settings.web_concurrency) == (9090, "debug", 3)
+    
+    def test_missing_notification_settings_warned_once_at_startup(self, monkeypatch, caplog):
+        """Test that unset notification variables produce a single startup warning."""
+        import logging
+        monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+        for var in ("GMAIL_USER", "GMAIL_APP_PASSWORD", "DEFAULT_EMAIL_RECIPIENT"):
+            monkeypatch.delenv(var, raising=False)
+        
+        with caplog.at_level(logging.WARNING, logger="mcp_autoprx"):
+            unified_server.UnifiedServer()
+        
+        warnings = [record.getMessage() for record in caplog.records if record.name == "mcp_autoprx"]
+        assert len(warnings) == 1
+        assert "GMAIL_USER, GMAIL_APP_PASSWORD, DEFAULT_EMAIL_RECIPIENT" in warnings[0]
+        assert "Slack notifications enabled" in warnings[0]
+        assert "Gmail notifications disabled" in warnings[0]
+    
+    def test_settings_are_frozen(self):
+        """Test that settings cannot be mutated after startup."""
+        import dataclasses
+        settings = unified_server.Settings.from_env()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.mcp_api_key = "other"
+
+
+class TestDiscoveryEndpoints:
+    """Test the static OAuth/OIDC discovery endpoints."""
+    
+    def test_openid_configuration(self):
+        """Test that the prebuilt OpenID configuration is served as JSON."""
+        from fastapi.testclient import TestClient
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        response = client.get("/.well-known/openid-configuration")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["jwks_uri"].endswith("/.well-known/jwks.json")
+    
+    def test_oauth_authorization_server(self):
+        """Test that the prebuilt OAuth metadata is served as JSON."""
+        from fastapi.testclient import TestClient
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        response = client.get("/.well-known/oauth-authorization-server")
+        
+        assert response.status_code == 200
+        assert response.json()["registration_endpoint"].endswith("/oauth/register")
+    
+    def test_cached_response_served_repeatedly(self):
+        """Test that the shared Response object can be sent more than once."""
+        from fastapi.testclient import TestClient
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        first = client.get("/.well-known/jwks.json")
+        second = client.get("/.well-known/jwks.json")
+        
+        assert first.content == second.content == unified_server.JWKS_JSON
+    
+    def test_root_splices_uptime(self, monkeypatch):
+        """Test that the root response stays valid JSON with a fresh uptime."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        data = client.get("/", headers={"x-api-key": "test-key"}).json()
+        
+        assert data["status"] == "running"
+        assert isinstance(data["uptime"], float)
+        assert data["services"]["webhook"] == "/webhook/github"
+    
+    def test_health_response(self, monkeypatch):
+        """Test that the prebuilt health response carries a fresh ISO timestamp."""
+        from datetime import datetime
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        response = client.get("/health", headers={"x-api-key": "test-key"})
+        
+        data = response.json()
+        assert response.headers["content-type"] == "application/json"
+        assert data["status"] == "healthy"
+        assert datetime.fromisoformat(data["timestamp"]).tzinfo is not None
+        assert data["mcp_debug"]["mcp_instance"] is True
+    
+    def test_tools_listing(self, monkeypatch):
+        """Test that the prebuilt tools listing is served as JSON."""
+        from fastapi.testclient import TestClient
+        monkeypatch.setenv("MCP_API_KEY", "test-key")
+        client = TestClient(unified_server.UnifiedServer().app)
+        
+        response = client.get("/tools", headers={"x-api-key": "test-key"})
+        
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert data["mcp_initialized"] is True
+        assert "get_workflow_status" in data["registered_tools"]
+        assert data["total_registered"] == len(data["tools"])
+
+
+class TestLifespan:
+    """Test startup and shutdown of the unified server."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_io_runs_on_bounded_executor(self, tmp_path, monkeypatch):
+        """Test that asyncio.to_thread uses the server's named, bounded thread pool, shut down on exit."""
+        import asyncio
+        import threading
+        server = unified_server.UnifiedServer()
+        
+        async with server.lifespan(server.app):
+            name = await asyncio.to_thread(lambda: threading.current_thread().name)
+        
+        assert name.startswith("mcp-autoprx-io")
+        assert not [t for t in threading.enumerate() if t.name.startswith("mcp-autoprx-io")]
+    
+    @pytest.mark.asyncio
+    async def test_shared_http_session_opened_once_and_closed(self, tmp_path, monkeypatch):
+        """Test that one keep-alive HTTP session serves the app's lifetime and is closed on shutdown."""
+        server = unified_server.UnifiedServer()
+        
+        async with server.lifespan(server.app):
+            session = server._http
+            assert server._get_http_session() is session
+            assert session.timeout.connect == 3
+            assert session.connector.limit_per_host == unified_server.HTTP_MAX_CONNECTIONS_PER_HOST
+        
+        assert session.closed and server._http is None
+    
+    @pytest.mark.asyncio
+    async def test_tool_modules_http_session_closed_on_shutdown(self):
+        """Test that the session used by the tool modules' Slack alert hooks is closed on shutdown."""
+        import mcp_instance
+        server = unified_server.UnifiedServer()
+        
+        async with server.lifespan(server.app):
+            session = mcp_instance.get_http_session()
+        
+        assert session.closed
+    
+    @pytest.mark.asyncio
+    async def test_shutdown_waits_for_in_flight_notification_flush(self, monkeypatch):
+        """Test that shutting down during a slow Slack send lets the send finish."""
+        import asyncio
+        monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+        server = unified_server.UnifiedServer()
+        started = asyncio.Event()
+        delivered = []
+        
+        async def slow_send(message):
+            started.set()
+            await asyncio.sleep(0.2)
+            delivered.append(message)
+            return "sent"
+        
+        with patch.object(server, 'send_slack_message', side_effect=slow_send):
+            async with server.lifespan(server.app):
+                server._queue_slack("first")
+                server._notify_full.set()
+                await started.wait()
+        
+        assert delivered == ["first"]
+    
+    @pytest.mark.asyncio
+    async def test_server_logger_writes_through_queue_during_lifespan(self, tmp_path, monkeypatch):
+        """Test that log records are handed to a listener thread and handlers are restored on shutdown."""
+        import logging
+        server = unified_server.UnifiedServer()
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        server_logger = logging.getLogger("mcp_autoprx")
+        server_logger.addHandler(handler)
+        try:
+            async with server.lifespan(server.app):
+                assert handler not in server_logger.handlers
+                assert isinstance(server_logger.handlers[0], unified_server.DroppingQueueHandler)
+                server_logger.warning("queued record")
+            
+            assert server_logger.handlers == [handler]
+            assert [record.getMessage() for record in records] == ["queued record"]
+        finally:
+            server_logger.removeHandler(handler)
+    
+    def test_queue_handler_defers_formatting_to_listener(self):
+        """Test that queued records keep their arguments and traceback unformatted."""
+        import logging
+        import queue
+        log_queue = queue.Queue()
+        handler = unified_server.DroppingQueueHandler(log_queue)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("mcp_autoprx", logging.ERROR, __file__, 1, "failed %s", ("x",), sys.exc_info())
+        
+        handler.handle(record)
+        
+        queued = log_queue.get_nowait()
+        assert queued is record
+        assert queued.msg == "failed %s" and queued.args == ("x",)
+        assert queued.exc_info is not None and queued.exc_text is None
+    
+    def test_full_queue_drops_only_records_below_warning(self):
+        """Test that a full queue drops and counts INFO records but waits to queue warnings."""
+        import logging
+        import queue
+        import threading
+        log_queue = queue.Queue(1)
+        handler = unified_server.DroppingQueueHandler(log_queue)
+        record = lambda level: logging.LogRecord("mcp_autoprx", level, __file__, 1, "msg", None, None)
+        
+        handler.handle(record(logging.INFO))
+        handler.handle(record(logging.INFO))
+        assert handler.dropped == 1
+        
+        drain = threading.Timer(0.05, log_queue.get)
+        drain.start()
+        handler.handle(record(logging.ERROR))
+        drain.join()
+        
+        assert log_queue.get_nowait().levelno == logging.ERROR
+        assert handler.dropped == 1
+    
+    def test_log_config_routes_server_logger_through_uvicorn(self):
+        """Test that the server logger shares uvicorn's default handler."""
+        import uvicorn
+        log_config = unified_server.build_log_config()
+        
+        assert log_config["loggers"]["mcp_autoprx"]["handlers"] == ["default"]
+        assert "mcp_autoprx" not in uvicorn.config.LOGGING_CONFIG["loggers"]
+    
+    def test_run_serves_app_factory_without_building_server(self):
+        """Test that the launcher leaves building the server to each worker."""
+        settings = unified_server.Settings(
+            mcp_api_key="", slack_webhook_url="", gmail_user="", gmail_app_password="",
+            default_email_recipient="", github_webhook_secret="", web_concurrency=2
+        )
+        
+        with patch.object(unified_server.uvicorn, 'run') as mock_run, \
+             patch.object(unified_server, 'UnifiedServer') as mock_server, \
+             patch('logging.config.dictConfig'):
+            unified_server.run(settings)
+        
+        mock_server.assert_not_called()
+        assert mock_run.call_args[0] == ("unified_server:create_app",)
+        assert mock_run.call_args[1]["factory"] is True
+        assert mock_run.call_args[1]["workers"] == 2
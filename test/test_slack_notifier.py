@@ -10,7 +10,7 @@ import asyncio
 import sys
 import os
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add the mcp-server directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'mcp-server')))
@@ -26,6 +26,16 @@ except ImportError as e:
     IMPORT_ERROR = str(e)
 
 
+def _response(status, text):
+    """Build a mock aiohttp response usable as an async context manager."""
+    response = MagicMock(status=status)
+    response.text = AsyncMock(return_value=text)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    return context
+
+
 class TestImplementation:
     """Test that the required functions are implemented."""
     
@@ -42,8 +52,8 @@ class TestSendSlackNotification:
     @pytest.mark.asyncio
     async def test_returns_json_string(self):
         """Test that send_slack_notification returns a JSON string."""
-        with patch('requests.post') as mock_post:
-            mock_post.return_value = MagicMock(status_code=200, text="ok")
+        with patch('tools.slack_notifier.get_http_session') as mock_session:
+            mock_session.return_value.post.return_value = _response(200, "ok")
             
             result = await send_slack_notification("Test message")
             
@@ -54,8 +64,8 @@ class TestSendSlackNotification:
     @pytest.mark.asyncio
     async def test_includes_required_fields(self):
         """Test that the result includes expected fields."""
-        with patch('requests.post') as mock_post:
-            mock_post.return_value = MagicMock(status_code=200, text="ok")
+        with patch('tools.slack_notifier.get_http_session') as mock_session:
+            mock_session.return_value.post.return_value = _response(200, "ok")
             
             result = await send_slack_notification("Test message")
             
@@ -63,6 +73,23 @@ class TestSendSlackNotification:
             assert isinstance(result, str), "Should return a status message"
 
 
+@pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
+class TestHttpSession:
+    """Test the lifetime of the shared Slack HTTP session."""
+    
+    @pytest.mark.asyncio
+    async def test_session_closed_on_server_shutdown(self):
+        """Test that the MCP server lifespan closes the shared session."""
+        import mcp_instance
+        
+        async with mcp_instance.lifespan(mcp_instance.mcp):
+            session = mcp_instance.get_http_session()
+            assert mcp_instance.get_http_session() is session
+        
+        assert session.closed
+        assert mcp_instance._http_session is None
+
+
 @pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
 class TestToolRegistration:
     """Test that tools are properly registered."""
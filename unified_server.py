@@ -5,25 +5,62 @@ Combines webhook server and MCP server into a single process.
 """
 
 import os
+import sys
 import json
+import gzip
+import hmac
+import hashlib
+import itertools
 import asyncio
+import base64
+import copy
+import inspect
+import logging
+import logging.config
+import logging.handlers
+import queue
+import random
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from urllib.parse import parse_qs
 from typing import Dict, List, Optional
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import requests
+from email.header import Header
+from email.utils import formataddr, parseaddr
+import aiohttp
+import aiosmtplib
+import msgspec
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+# Cross-process locking of the event log (unavailable on Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Tool modules and shared helpers live under mcp-server/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'mcp-server')))
+from email_html import render_html
+from event_log import read_last_lines, terminate_partial_line
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("mcp_autoprx")
+# Log records waiting for the listener thread; beyond this, new records are dropped
+LOG_QUEUE_SIZE = 10_000
+
 # FastAPI for unified HTTP server
 try:
     from fastapi import FastAPI, Request, HTTPException
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import Response
     import uvicorn
     FASTAPI_AVAILABLE = True
 except ImportError:
@@ -45,14 +82,459 @@ MCP_TOOLS_AVAILABLE = True
 
 # Configuration
 EVENTS_FILE = Path("github_events.json")
-PROCESSED_EVENTS = set()
+EVENTS_LOG = EVENTS_FILE.with_suffix(".jsonl")  # Append-only log, one event per line
+EVENTS_LOCK = EVENTS_FILE.with_suffix(".jsonl.lock")  # Shared by all workers
+MAX_STORED_EVENTS = 100
+EVENTS_COMPACT_INTERVAL = 60  # Seconds between rewrites of the trimmed log
+EVENTS_FLUSH_INTERVAL = 0.1  # Seconds to gather event lines into one append
+EVENTS_FSYNC_EVERY = 10  # fsync the log every N flushes
+PAYLOADS_DIR = Path("payloads")  # Holds at most MAX_STORED_EVENTS payloads after each compaction
+# X-GitHub-Event is not covered by the signature and ends up in a file name
+GITHUB_EVENT_NAME = re.compile(r"[a-z_]+")
+CLOCK_REFRESH_INTERVAL = 0.1  # Seconds an event timestamp may lag the wall clock
+NOTIFY_FLUSH_INTERVAL = 2.0  # Seconds to coalesce event notifications
+NOTIFY_BATCH_SIZE = 20  # Flush early once this many notifications are queued
+BLOCKING_IO_THREADS = 4  # Threads behind asyncio.to_thread (event log, payload files)
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_CONNECTIONS_PER_HOST = 20
+HTTP_KEEPALIVE_SECONDS = 75  # Keep idle connections to Slack warm between notification flushes
+HTTP_DNS_CACHE_SECONDS = 300
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+SLACK_MAX_CONCURRENCY = 20  # Concurrent webhook POSTs per worker
+SLACK_MAX_ATTEMPTS = 5
+SLACK_RETRY_BASE_DELAY = 1.0  # Seconds; doubles per attempt, with full jitter
+SLACK_RETRY_MAX_DELAY = 30.0
+SLACK_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+JSON_HEADERS = {"Content-Type": "application/json"}
+SMTP_POOL_SIZE = 5  # Gmail connections kept open for reuse
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100  # Reconnect after this many sends
+SMTP_IDLE_CHECK_SECONDS = 30  # NOOP-check connections idle longer than this before reuse
+# Delivery IDs seen recently; bounded so redelivery storms cannot grow memory
+PROCESSED_EVENTS = TTLCache(maxsize=10_000, ttl=7200)
+
+# Endpoints that skip the API key check
+PUBLIC_ENDPOINTS = frozenset({
+    "/", "/health", "/docs", "/openapi.json",
+    "/.well-known/openid-configuration",
+    "/.well-known/oauth-authorization-server",
+    "/.well-known/jwks.json",
+    "/oauth/register",
+    "/oauth/token",
+    "/token",
+    "/authorize",
+    "/webhook/github",  # GitHub webhooks have their own signature check
+})
+# Tool discovery endpoints that are public for GET
+PUBLIC_DISCOVERY_ENDPOINTS = frozenset({"/mcp", "/mcp/tools"})
+
+# OAuth/OIDC discovery documents are static, so serialize them once at import
+SERVER_URL = "https://mcp-autoprx-production.up.railway.app"
+OPENID_CONFIGURATION_JSON = orjson.dumps({
+    "issuer": SERVER_URL,
+    "authorization_endpoint": f"{SERVER_URL}/authorize",
+    "token_endpoint": f"{SERVER_URL}/token",
+    "jwks_uri": f"{SERVER_URL}/.well-known/jwks.json",
+    "response_types_supported": ["code", "token", "id_token"],
+    "subject_types_supported": ["public"],
+    "id_token_signing_alg_values_supported": ["RS256"],
+    "scopes_supported": ["openid", "profile", "email"],
+    "token_endpoint_auth_methods_supported": ["client_secret_basic"],
+    "claims_supported": ["sub", "iss", "name", "email"],
+    "code_challenge_methods_supported": ["S256"]
+})
+OAUTH_AUTHORIZATION_SERVER_JSON = orjson.dumps({
+    "issuer": SERVER_URL,
+    "authorization_endpoint": f"{SERVER_URL}/authorize",
+    "token_endpoint": f"{SERVER_URL}/token",
+    "scopes_supported": ["openid", "profile", "email"],
+    "response_types_supported": ["code", "token"],
+    "grant_types_supported": ["authorization_code", "client_credentials"],
+    "token_endpoint_auth_methods_supported": ["client_secret_basic"],
+    "code_challenge_methods_supported": ["S256"],
+    "registration_endpoint": f"{SERVER_URL}/oauth/register"
+})
+JWKS_JSON = orjson.dumps({
+    "keys": [
+        {
+            "kty": "RSA",
+            "use": "sig",
+            "kid": "mcp-autoprx-key-1",
+            "alg": "RS256",
+            "n": "mock-modulus-for-testing",
+            "e": "AQAB"
+        }
+    ]
+})
+
+# Root response is static apart from "uptime", which is spliced in per request
+ROOT_JSON_HEAD = orjson.dumps({
+    "message": "MCP-AutoPRX Unified Server",
+    "version": "1.0.0",
+    "status": "running",
+})[:-1] + b',"uptime":'
+ROOT_JSON_TAIL = b"," + orjson.dumps({
+    "services": {
+        "webhook": "/webhook/github",
+        "health": "/health",
+        "mcp": "/mcp" if MCP_AVAILABLE else "disabled",
+        "tools": "/tools" if MCP_AVAILABLE else "disabled"
+    },
+    "documentation": "Available at /docs"
+})[1:]
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment configuration, read once at startup instead of per request."""
+    mcp_api_key: str
+    slack_webhook_url: str
+    gmail_user: str
+    gmail_app_password: str
+    default_email_recipient: str
+    github_webhook_secret: str
+    port: int = 8080
+    log_level: str = "info"
+    web_concurrency: int = 1
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the process environment."""
+        return cls(
+            mcp_api_key=os.getenv("MCP_API_KEY", "").strip(),
+            slack_webhook_url=os.getenv("SLACK_WEBHOOK_URL", "").strip(),
+            gmail_user=os.getenv("GMAIL_USER", "").strip(),
+            gmail_app_password=os.getenv("GMAIL_APP_PASSWORD", "").strip(),
+            default_email_recipient=os.getenv("DEFAULT_EMAIL_RECIPIENT", "").strip(),
+            github_webhook_secret=os.getenv("GITHUB_WEBHOOK_SECRET", "").strip(),
+            port=int(os.getenv("PORT", "8080")),
+            log_level=os.getenv("LOG_LEVEL", "info").strip().lower(),
+            web_concurrency=int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, 4))),
+        )
+
+def json_payload(body: bytes) -> bytes:
+    """Return a JSON webhook body as-is."""
+    return body
+
+def form_payload(body: bytes) -> Optional[bytes]:
+    """Extract the JSON "payload" field from a form-encoded webhook body."""
+    # parse_qs on bytes re-encodes values as ASCII; latin-1 round-trips every byte unchanged
+    values = parse_qs(body.decode("latin-1"), encoding="latin-1").get("payload")
+    return values[0].encode("latin-1") if values else None
+
+# Webhook media type -> extractor of the raw JSON payload
+WEBHOOK_PAYLOAD_EXTRACTORS = {
+    "application/json": json_payload,
+    "application/x-www-form-urlencoded": form_payload,
+}
+
+@contextmanager
+def event_log_lock():
+    """Hold an exclusive lock on the event log across worker processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(EVENTS_LOCK, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# Subset of the GitHub webhook payload used by the server. Decoding straight into
+# these structs skips building the full payload dict; unknown fields are ignored.
+class Repository(msgspec.Struct):
+    full_name: Optional[str] = None
+
+class Sender(msgspec.Struct):
+    login: Optional[str] = None
+
+class Pusher(msgspec.Struct):
+    name: Optional[str] = None
+
+class HookConfig(msgspec.Struct):
+    url: Optional[str] = None
+
+class Hook(msgspec.Struct):
+    id: Optional[int] = None
+    config: Optional[HookConfig] = None
+
+class WorkflowRun(msgspec.Struct):
+    name: Optional[str] = None
+    status: Optional[str] = None
+    conclusion: Optional[str] = None
+    head_branch: Optional[str] = None
+    run_number: Optional[int] = None
+    updated_at: Optional[str] = None
+    html_url: Optional[str] = None
+
+class GitHubEvent(msgspec.Struct):
+    action: Optional[str] = None
+    ref: Optional[str] = None
+    repository: Optional[Repository] = None
+    sender: Optional[Sender] = None
+    pusher: Optional[Pusher] = None
+    hook: Optional[Hook] = None
+    workflow_run: Optional[WorkflowRun] = None
+    check_run: Optional[dict] = None
+    
+    @property
+    def repository_name(self) -> Optional[str]:
+        return self.repository.full_name if self.repository else None
+    
+    @property
+    def sender_login(self) -> Optional[str]:
+        return self.sender.login if self.sender else None
+
+# Tool schemas advertised to MCP clients via tools/list
+MCP_TOOL_SCHEMAS = [
+    {
+        "name": "analyze_file_changes",
+        "description": "Analyze file changes in the current branch compared to base branch.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_branch": {"type": "string", "default": "main"},
+                "include_diff": {"type": "boolean", "default": True},
+                "max_diff_lines": {"type": "integer", "default": 500},
+                "working_directory": {"type": "string"}
+            }
+        }
+    },
+    {
+        "name": "get_pr_templates",
+        "description": "Get available PR templates.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "suggest_template",
+        "description": "Suggest appropriate PR template based on changes.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "changes_summary": {"type": "string"},
+                "change_type": {"type": "string", "default": "feature"}
+            },
+            "required": ["changes_summary"]
+        }
+    },
+    {
+        "name": "get_recent_actions_events",
+        "description": "Get recent GitHub Actions events.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "default": 10}
+            }
+        }
+    },
+    {
+        "name": "get_workflow_status",
+        "description": "Get the current status of GitHub Actions workflows.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "workflow_name": {"type": "string"}
+            }
+        }
+    },
+    {
+        "name": "get_documentation_workflow_status",
+        "description": "Get the status of documentation-related workflows.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_failed_workflows",
+        "description": "Get only failed workflows for quick troubleshooting.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "send_slack_notification",
+        "description": "Send a notification to Slack.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "message": {"type": "string"}
+            },
+            "required": ["message"]
+        }
+    },
+    {
+        "name": "send_gmail_notification",
+        "description": "Send a notification via Gmail.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "subject": {"type": "string"},
+                "message": {"type": "string"},
+                "recipient": {"type": "string"}
+            },
+            "required": ["subject", "message"]
+        }
+    }
+]
+
+EMAIL_FOOTER = "Sent by MCP-AutoPRX Unified Server"
+
+# Preformatted plain-text + HTML email. Bodies are base64 so no line exceeds SMTP's limit,
+# and "=_" cannot occur in base64 text, which makes the fixed boundary safe
+EMAIL_BOUNDARY = b"=_mcp-autoprx-alternative"
+EMAIL_MIME_TEMPLATE = (
+    b"From: %(from)s\r\n"
+    b"To: %(to)s\r\n"
+    b"Subject: %(subject)s\r\n"
+    b"MIME-Version: 1.0\r\n"
+    b'Content-Type: multipart/alternative; boundary="%(boundary)s"\r\n'
+    b"\r\n"
+    b"--%(boundary)s\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"Content-Transfer-Encoding: base64\r\n"
+    b"\r\n"
+    b"%(text)s"
+    b"--%(boundary)s\r\n"
+    b"Content-Type: text/html; charset=utf-8\r\n"
+    b"Content-Transfer-Encoding: base64\r\n"
+    b"\r\n"
+    b"%(html)s"
+    b"--%(boundary)s--\r\n"
+)
+
+def header_value(value: str) -> bytes:
+    """Encode a header value, dropping CR/LF so it cannot inject further headers."""
+    value = " ".join(value.splitlines())
+    return Header(value, "us-ascii" if value.isascii() else "utf-8").encode(linesep="\r\n").encode("ascii")
+
+def address_header(address: str) -> bytes:
+    """Normalize an email address for a From/To header."""
+    return header_value(formataddr(parseaddr(" ".join(address.splitlines()))))
+
+def render_email(sender: str, recipient: str, subject: str, text: str, html: str) -> bytes:
+    """Render a multipart/alternative email straight to bytes."""
+    return EMAIL_MIME_TEMPLATE % {
+        b"from": address_header(sender),
+        b"to": address_header(recipient),
+        b"subject": header_value(subject),
+        b"boundary": EMAIL_BOUNDARY,
+        b"text": base64.encodebytes(text.encode()).replace(b"\n", b"\r\n"),
+        b"html": base64.encodebytes(html.encode()).replace(b"\n", b"\r\n"),
+    }
+
+# Per-conclusion wording for workflow_run notifications:
+# (title, intro for one run, intro for several, closing line)
+WORKFLOW_NOTICES = {
+    "failure": (
+        "CI Failure Alert",
+        "A CI workflow has failed:",
+        "{count} CI workflows have failed:",
+        "Please check the logs and address any issues.",
+    ),
+    "success": (
+        "Deployment Successful",
+        "A workflow has completed successfully:",
+        "{count} workflows have completed successfully:",
+        "Deployment completed successfully!",
+    ),
+}
+
+# Notification text, filled per event with str.format_map from a context dict
+# built once from the parsed payload
+PING_SLACK_TMPL = "Webhook ping received from {repo} (Hook ID: {hook_id}, URL: {hook_url})"
+PUSH_SLACK_TMPL = "New push to {repo} by {pusher} on {ref}"
+WORKFLOW_SLACK_TMPL = (
+    "{title} - Workflow: {name}, Repository: {repo}, Branch: {branch}, "
+    "Run Number: {run_number}, View Details: {url}"
+)
+WORKFLOW_SLACK_GROUP_TMPL = "{title} - {count} workflows in {repo}:"
+WORKFLOW_SLACK_LINE_TMPL = "• Workflow: {name}, Branch: {branch}, Run Number: {run_number}, View Details: {url}"
+WORKFLOW_EMAIL_RUN_TMPL = (
+    "• Workflow: {name}\n"
+    "• Repository: {repo}\n"
+    "• Branch: {branch}\n"
+    "• Run Number: {run_number}\n"
+    "• View Details: {url}\n"
+)
+
+def render_workflow_slack(repo: str, conclusion: str, runs: List[dict]) -> str:
+    """Render one Slack message for the workflow runs of a (repo, conclusion) group."""
+    title = WORKFLOW_NOTICES[conclusion][0]
+    if len(runs) == 1:
+        return WORKFLOW_SLACK_TMPL.format_map({"title": title, **runs[0]})
+    lines = [WORKFLOW_SLACK_GROUP_TMPL.format_map({"title": title, "count": len(runs), "repo": repo})]
+    lines += [WORKFLOW_SLACK_LINE_TMPL.format_map(run) for run in runs]
+    return "\n".join(lines)
+
+def render_workflow_email(repo: str, conclusion: str, runs: List[dict]) -> tuple:
+    """Render the (subject, body) of one email for a (repo, conclusion) group."""
+    title, intro_one, intro_many, closing = WORKFLOW_NOTICES[conclusion]
+    subject = f"{title} - {repo}" if len(runs) == 1 else f"{title} - {repo} ({len(runs)} workflows)"
+    lines = [title, "", intro_one if len(runs) == 1 else intro_many.format(count=len(runs))]
+    lines += [WORKFLOW_EMAIL_RUN_TMPL.format_map(run) for run in runs]
+    lines.append(closing)
+    return subject, "\n".join(lines)
 
 class UnifiedServer:
     def __init__(self):
         if not FASTAPI_AVAILABLE:
             raise ImportError("FastAPI is required but not available. Install with: pip install fastapi uvicorn")
         
-        self.app = FastAPI(title="MCP-AutoPRX Unified Server", version="1.0.0")
+        self.app = FastAPI(title="MCP-AutoPRX Unified Server", version="1.0.0", lifespan=self.lifespan)
+        
+        # Readers such as the CI monitor tools use the log on disk, which all workers append to
+        self._prepare_event_log()
+        self._events_lock = asyncio.Lock()
+        self._events_appended = 0
+        # Serialized lines waiting for the background writer
+        self._pending_lines: List[bytes] = []
+        self._events_pending = asyncio.Event()
+        self._flush_count = 0
+        # Event timestamps, reformatted at most every CLOCK_REFRESH_INTERVAL
+        self._clock_expires = 0.0
+        self._clock_strings = ("", "", "")
+        # Keeps payload file names unique within a cached timestamp, across workers
+        self._payload_names = (f"{os.getpid()}-{n}" for n in itertools.count())
+        
+        # Shared HTTP client for outbound notifications, opened in lifespan
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._slack_semaphore = asyncio.Semaphore(SLACK_MAX_CONCURRENCY)
+        # Slots of (connection, messages sent, last used); connections open lazily on first
+        # use, and LIFO order hands out the most recently used (warm) one first
+        self._smtp_pool: asyncio.LifoQueue = asyncio.LifoQueue(maxsize=SMTP_POOL_SIZE)
+        for _ in range(SMTP_POOL_SIZE):
+            self._smtp_pool.put_nowait((None, 0, 0.0))
+        
+        # Webhook deliveries being processed, keyed by X-GitHub-Delivery
+        self._inflight_deliveries: Dict[str, asyncio.Future] = {}
+        # Notifications run after the webhook response; keep references until done
+        self._background_tasks = set()
+        # Event notifications queued for the next coalesced Slack post / email
+        self._slack_batch: List[str] = []
+        self._workflow_batch: Dict[tuple, List[dict]] = {}
+        self._queued_workflow_runs = 0
+        self._notify_pending = asyncio.Event()
+        self._notify_full = asyncio.Event()
+        self._notify_stopping = False
+        
+        self.settings = Settings.from_env()
+        self._api_key_bytes = self.settings.mcp_api_key.encode()
+        # Keyed once; each webhook copies it instead of re-deriving the HMAC pads
+        self._hmac_template = (
+            hmac.new(self.settings.github_webhook_secret.encode(), None, hashlib.sha256)
+            if self.settings.github_webhook_secret else None
+        )
+        
+        # Notification channels are enabled once at startup from the environment
+        self.slack_enabled = bool(self.settings.slack_webhook_url)
+        self.gmail_enabled = bool(
+            self.settings.gmail_user and self.settings.gmail_app_password and self.settings.default_email_recipient
+        )
+        self._warn_missing_notification_settings()
         
         # Create MCP instance directly
         self.mcp = None
@@ -60,20 +542,82 @@ class UnifiedServer:
             try:
                 from mcp.server.fastmcp import FastMCP
                 self.mcp = FastMCP("mcp-autoprx")
-                print("Created new MCP instance")
-                print(f"MCP instance type: {type(self.mcp)}")
+                logger.debug("Created MCP instance: %s", type(self.mcp).__name__)
             except Exception as e:
-                print(f"Warning: MCP initialization failed: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("MCP initialization failed: %s", e)
                 self.mcp = None
         else:
-            print("MCP not available - server will run without MCP functionality")
+            logger.info("MCP not available - server will run without MCP functionality")
+        
+        self._tool_dispatch = {}
+        self._tool_schemas: List[dict] = []
         
         self.setup_routes()
         self.setup_middleware()
         self.setup_mcp_tools()
+        # The tools listing only depends on state fixed at startup
+        self._tools_response = Response(content=self._build_tools_listing(), media_type="application/json")
         
+    def _warn_missing_notification_settings(self):
+        """Log once at startup which notification settings are missing, instead of failing per send."""
+        missing = [
+            name for name, value in (
+                ("SLACK_WEBHOOK_URL", self.settings.slack_webhook_url),
+                ("GMAIL_USER", self.settings.gmail_user),
+                ("GMAIL_APP_PASSWORD", self.settings.gmail_app_password),
+                ("DEFAULT_EMAIL_RECIPIENT", self.settings.default_email_recipient),
+            )
+            if not value
+        ]
+        if missing:
+            logger.warning(
+                "Notification settings not set: %s (Slack notifications %s, Gmail notifications %s)",
+                ", ".join(missing),
+                "enabled" if self.slack_enabled else "disabled",
+                "enabled" if self.gmail_enabled else "disabled",
+            )
+    
+    @asynccontextmanager
+    async def lifespan(self, app):
+        """Run background maintenance tasks for the lifetime of the app."""
+        # Bound the threads used for file I/O so webhook bursts cannot grow them unchecked
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=BLOCKING_IO_THREADS, thread_name_prefix="mcp-autoprx-io")
+        )
+        # Each worker applies the logging config before startup, so the queue is set up here
+        log_listener = start_queue_logging(logger)
+        self._get_http_session()
+        writer = asyncio.create_task(self._write_events_periodically())
+        compactor = asyncio.create_task(self._compact_events_periodically())
+        notifier = asyncio.create_task(self._flush_notifications_periodically())
+        try:
+            yield
+        finally:
+            compactor.cancel()
+            writer.cancel()
+            if self._background_tasks:
+                await asyncio.gather(*self._background_tasks, return_exceptions=True)
+            # Cancelling the notifier mid-flush would drop the batch it already took;
+            # let it finish, then make one last pass over anything still queued
+            self._notify_stopping = True
+            self._notify_pending.set()
+            self._notify_full.set()
+            await asyncio.gather(notifier, return_exceptions=True)
+            await self.flush_notifications()
+            await self.flush_events()
+            await self.compact_events()
+            if self._http is not None:
+                await self._http.close()
+                self._http = None
+            await self._close_smtp_pool()
+            # The Slack alert hooks of the imported tool modules keep their own session
+            mcp_instance = sys.modules.get("mcp_instance")
+            if mcp_instance is not None:
+                await mcp_instance.close_http_session()
+            if log_listener is not None:
+                stop_queue_logging(logger, log_listener)
+            await asyncio.get_running_loop().shutdown_default_executor()
+    
     def setup_middleware(self):
         """Setup CORS and security middleware."""
         self.app.add_middleware(
@@ -87,52 +631,34 @@ class UnifiedServer:
         # Add API key protection middleware
         @self.app.middleware("http")
         async def verify_api_key(request: Request, call_next):
+            path = request.url.path
+            
             # Allow public access to GET /mcp and /mcp/tools (tool discovery)
-            if request.method == "GET" and request.url.path in ["/mcp", "/mcp/tools"]:
+            if request.method == "GET" and path in PUBLIC_DISCOVERY_ENDPOINTS:
                 return await call_next(request)
 
             # Require API key for POST /mcp (tool calls)
-            if request.method == "POST" and request.url.path == "/mcp":
+            if request.method == "POST" and path == "/mcp":
                 api_key = request.headers.get("x-api-key")
-                expected_api_key = os.getenv("MCP_API_KEY")
-                if not expected_api_key or api_key != expected_api_key:
+                if not self._is_valid_api_key(api_key):
                     raise HTTPException(status_code=403, detail="API key required for tool calls.")
                 return await call_next(request)
 
-            # Skip API key check for public endpoints
-            public_endpoints = [
-                "/", "/health", "/docs", "/openapi.json",
-                "/.well-known/openid-configuration",
-                "/.well-known/oauth-authorization-server",
-                "/.well-known/jwks.json",
-                "/oauth/register",
-                "/oauth/token",
-                "/token",
-                "/authorize"
-            ]
-            
-            # Allow all .well-known endpoints (OAuth discovery)
-            if request.url.path.startswith("/.well-known/"):
-                return await call_next(request)
-                
-            if request.url.path in public_endpoints:
-                return await call_next(request)
-            
-            # Skip API key check for GitHub webhooks (they have their own security)
-            if request.url.path == "/webhook/github":
+            # Skip API key check for public endpoints and all .well-known
+            # endpoints (OAuth discovery)
+            if path in PUBLIC_ENDPOINTS or path.startswith("/.well-known/"):
                 return await call_next(request)
             
             # Require API key for all other endpoints
             api_key = request.headers.get("x-api-key")
-            expected_api_key = os.getenv("MCP_API_KEY")
             
-            if not expected_api_key:
+            if not self.settings.mcp_api_key:
                 raise HTTPException(
                     status_code=500,
                     detail="MCP_API_KEY environment variable not set. Please configure API key for security."
                 )
             
-            if not api_key or api_key != expected_api_key:
+            if not self._is_valid_api_key(api_key):
                 raise HTTPException(
                     status_code=403, 
                     detail="API key required. Set x-api-key header."
@@ -140,60 +666,39 @@ class UnifiedServer:
             
             return await call_next(request)
     
+    def _is_valid_api_key(self, api_key: Optional[str]) -> bool:
+        """Compare an API key against MCP_API_KEY in constant time."""
+        if not api_key or not self._api_key_bytes:
+            return False
+        return hmac.compare_digest(api_key.encode(), self._api_key_bytes)
+    
     def setup_routes(self):
         """Setup HTTP routes for both webhooks and LLM access."""
         
+        # Constant documents are served from Response objects built once;
+        # nothing mutates them after construction, so requests can share them
+        openid_response = Response(content=OPENID_CONFIGURATION_JSON, media_type="application/json")
+        oauth_response = Response(content=OAUTH_AUTHORIZATION_SERVER_JSON, media_type="application/json")
+        jwks_response = Response(content=JWKS_JSON, media_type="application/json")
+        
         @self.app.get("/.well-known/openid-configuration")
         async def openid_configuration():
-            return {
-                "issuer": "https://mcp-autoprx-production.up.railway.app",
-                "authorization_endpoint": "https://mcp-autoprx-production.up.railway.app/authorize",
-                "token_endpoint": "https://mcp-autoprx-production.up.railway.app/token",
-                "jwks_uri": "https://mcp-autoprx-production.up.railway.app/.well-known/jwks.json",
-                "response_types_supported": ["code", "token", "id_token"],
-                "subject_types_supported": ["public"],
-                "id_token_signing_alg_values_supported": ["RS256"],
-                "scopes_supported": ["openid", "profile", "email"],
-                "token_endpoint_auth_methods_supported": ["client_secret_basic"],
-                "claims_supported": ["sub", "iss", "name", "email"],
-                "code_challenge_methods_supported": ["S256"]
-            }
+            return openid_response
 
         @self.app.get("/.well-known/oauth-authorization-server")
         async def oauth_authorization_server():
-            return {
-                "issuer": "https://mcp-autoprx-production.up.railway.app",
-                "authorization_endpoint": "https://mcp-autoprx-production.up.railway.app/authorize",
-                "token_endpoint": "https://mcp-autoprx-production.up.railway.app/token",
-                "scopes_supported": ["openid", "profile", "email"],
-                "response_types_supported": ["code", "token"],
-                "grant_types_supported": ["authorization_code", "client_credentials"],
-                "token_endpoint_auth_methods_supported": ["client_secret_basic"],
-                "code_challenge_methods_supported": ["S256"],
-                "registration_endpoint": "https://mcp-autoprx-production.up.railway.app/oauth/register"
-            }
+            return oauth_response
 
         @self.app.get("/.well-known/jwks.json")
         async def jwks_endpoint():
             """JSON Web Key Set endpoint for OAuth/OIDC."""
-            return {
-                "keys": [
-                    {
-                        "kty": "RSA",
-                        "use": "sig",
-                        "kid": "mcp-autoprx-key-1",
-                        "alg": "RS256",
-                        "n": "mock-modulus-for-testing",
-                        "e": "AQAB"
-                    }
-                ]
-            }
+            return jwks_response
 
         @self.app.post("/oauth/register")
         async def oauth_register(request: Request):
             """OAuth client registration endpoint."""
             try:
-                data = await request.json()
+                data = orjson.loads(await request.body())
                 # Return a mock client registration response
                 return {
                     "client_id": "mcp-client-" + str(int(time.time())),
@@ -275,17 +780,16 @@ class UnifiedServer:
             try:
                 # Check if API key is provided in headers
                 api_key = request.headers.get("x-api-key") if request else None
-                expected_api_key = os.getenv("MCP_API_KEY")
                 
                 # If no API key in headers, try to get it from query params
                 if not api_key:
                     api_key = request.query_params.get("api_key") if request else None
                 
                 # Validate API key
-                if not expected_api_key:
+                if not self.settings.mcp_api_key:
                     raise HTTPException(status_code=500, detail="MCP_API_KEY not configured")
                 
-                if not api_key or api_key != expected_api_key:
+                if not self._is_valid_api_key(api_key):
                     # For OAuth flow, return a redirect to indicate success
                     # This allows the OAuth flow to complete without browser
                     auth_code = f"auth_code_{int(time.time())}_{client_id}"
@@ -314,37 +818,34 @@ class UnifiedServer:
         
         @self.app.get("/")
         async def root():
-            return {
-                "message": "MCP-AutoPRX Unified Server",
-                "version": "1.0.0",
-                "status": "running",
-                "uptime": time.time(),
-                "services": {
-                    "webhook": "/webhook/github",
-                    "health": "/health",
-                    "mcp": "/mcp" if MCP_AVAILABLE else "disabled",
-                    "tools": "/tools" if MCP_AVAILABLE else "disabled"
-                },
-                "documentation": "Available at /docs"
+            return Response(
+                content=ROOT_JSON_HEAD + orjson.dumps(time.time()) + ROOT_JSON_TAIL,
+                media_type="application/json"
+            )
+        
+        # Health response is fixed at startup apart from "timestamp"
+        health_json_head = orjson.dumps({"status": "healthy"})[:-1] + b',"timestamp":'
+        health_json_tail = b"," + orjson.dumps({
+            "services": {
+                "webhook": "active",
+                "notifications": "active",
+                "mcp": "active" if MCP_AVAILABLE else "disabled"
+            },
+            "mcp_debug": {
+                "mcp_available": MCP_AVAILABLE,
+                "mcp_tools_available": MCP_TOOLS_AVAILABLE,
+                "mcp_instance": self.mcp is not None,
+                "registered_tools": "tools_available" if self.mcp else 0
             }
+        })[1:]
         
         @self.app.get("/health")
         async def health_check():
-            return {
-                "status": "healthy",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "services": {
-                    "webhook": "active",
-                    "notifications": "active",
-                    "mcp": "active" if MCP_AVAILABLE else "disabled"
-                },
-                "mcp_debug": {
-                    "mcp_available": MCP_AVAILABLE,
-                    "mcp_tools_available": MCP_TOOLS_AVAILABLE,
-                    "mcp_instance": self.mcp is not None,
-                    "registered_tools": "tools_available" if self.mcp else 0
-                }
-            }
+            # orjson writes aware datetimes in the same form as isoformat()
+            return Response(
+                content=health_json_head + orjson.dumps(datetime.now(timezone.utc)) + health_json_tail,
+                media_type="application/json"
+            )
         
         @self.app.get("/test")
         async def test_endpoint():
@@ -383,32 +884,16 @@ class UnifiedServer:
         @self.app.get("/tools")
         async def list_tools():
             """List available MCP tools for LLMs."""
-            if not MCP_AVAILABLE:
-                return {"error": "MCP not available"}
-            
-            if not self.mcp:
-                return {"error": "MCP instance not initialized"}
-            
-            # Tools are registered with decorators, not stored in attributes
-            registered_tools = ["test_tool", "get_server_info", "list_available_tools"]
-            
-            return {
-                "registered_tools": registered_tools,
-                "total_registered": len(registered_tools),
-                "mcp_available": MCP_AVAILABLE,
-                "mcp_initialized": self.mcp is not None,
-                "mcp_instance_type": type(self.mcp).__name__ if self.mcp else None,
-                "note": "Tools are registered with @mcp.tool() decorators and available via MCP protocol"
-            }
+            return self._tools_response
         
         @self.app.get("/test-email")
         async def test_email():
             """Test Gmail functionality independently."""
             try:
                 # Check environment variables
-                gmail_user = os.getenv("GMAIL_USER", "").strip()
-                gmail_password = os.getenv("GMAIL_APP_PASSWORD", "").strip()
-                default_recipient = os.getenv("DEFAULT_EMAIL_RECIPIENT", "").strip()
+                gmail_user = self.settings.gmail_user
+                gmail_password = self.settings.gmail_app_password
+                default_recipient = self.settings.default_email_recipient
                 
                 env_check = {
                     "GMAIL_USER": "Set" if gmail_user else "Missing",
@@ -435,8 +920,6 @@ class UnifiedServer:
                 If you receive this, Gmail integration is working correctly!
                 """
                 
-                # Add more detailed logging
-                print(f"Attempting to send email from {gmail_user} to {default_recipient}")
                 # Test sending to both recipient and sender
                 result = await self.send_gmail_message(subject, message, default_recipient)
                 
@@ -447,8 +930,8 @@ class UnifiedServer:
                         f"Self-test email: {message}", 
                         gmail_user
                     )
-                    print(f"Self-test email result: {test_result}")
-                print(f"Email send result: {result}")
+                    logger.debug("Self-test email result: %s", test_result)
+                logger.info("Test email result: %s", result)
                 
                 return {
                     "status": "success" if "successfully" in result else "error",
@@ -468,104 +951,64 @@ class UnifiedServer:
                     "env_check": env_check if 'env_check' in locals() else "Could not check"
                 }
         
+        # Bound once so the per-request signature check only touches locals
+        hmac_template = self._hmac_template
+        compare_digest = hmac.compare_digest
+        
         @self.app.post("/webhook/github")
         async def github_webhook(request: Request):
             """Handle GitHub webhooks - combines webhook server functionality."""
             try:
+                # Read the body once; it feeds both signature verification and parsing
+                body = await request.body()
+                
                 # Verify GitHub webhook signature if secret is set
-                webhook_secret = os.getenv("GITHUB_WEBHOOK_SECRET")
-                if webhook_secret:
-                    import hmac
-                    import hashlib
-                    
+                if hmac_template is not None:
                     signature = request.headers.get("x-hub-signature-256")
                     if not signature:
                         raise HTTPException(status_code=401, detail="Missing signature")
                     
-                    # Verify signature
-                    expected_signature = "sha256=" + hmac.new(
-                        webhook_secret.encode(),
-                        await request.body(),
-                        hashlib.sha256
-                    ).hexdigest()
+                    # hashlib.sha256 is OpenSSL-backed, so this runs in C
+                    mac = hmac_template.copy()
+                    mac.update(body)
+                    expected_signature = "sha256=" + mac.hexdigest()
                     
-                    if not hmac.compare_digest(signature, expected_signature):
+                    if not compare_digest(signature, expected_signature):
                         raise HTTPException(status_code=401, detail="Invalid signature")
-                    
-                    # Reset body for processing
-                    await request.body()
-                
-                # Get raw body for processing
-                body = await request.body()
-                if not body:
-                    print("Warning: Empty webhook body received")
-                    return {"status": "received", "event_type": "empty", "message": "Empty body"}
                 
-                # Check content type
-                content_type = request.headers.get("content-type", "")
-                print(f"Content-Type: {content_type}")
+                # GitHub redelivers on timeouts and 5xx; only process each delivery once
+                delivery_id = request.headers.get("X-GitHub-Delivery")
+                if not delivery_id:
+                    return await self.handle_github_delivery(request.headers, body)
+                if delivery_id in PROCESSED_EVENTS:
+                    return {"status": "duplicate", "delivery_id": delivery_id}
+                inflight = self._inflight_deliveries.get(delivery_id)
+                if inflight is not None:
+                    # A concurrent redelivery waits for and shares the first one's outcome
+                    return await asyncio.shield(inflight)
                 
-                # Handle different content types
-                if "application/json" in content_type:
-                    # JSON payload
-                    try:
-                        data = await request.json()
-                    except json.JSONDecodeError as json_error:
-                        print(f"JSON decode error: {json_error}")
-                        print(f"Raw body: {body[:200]}...")
-                        return {"status": "error", "message": "Invalid JSON", "detail": str(json_error)}
-                elif "application/x-www-form-urlencoded" in content_type:
-                    # Form-encoded payload (GitHub sometimes sends this)
-                    try:
-                        form_data = await request.form()
-                        payload = form_data.get("payload")
-                        if payload:
-                            data = json.loads(payload)
-                        else:
-                            print("No payload in form data")
-                            return {"status": "error", "message": "No payload in form data"}
-                    except json.JSONDecodeError as json_error:
-                        print(f"Form payload JSON decode error: {json_error}")
-                        print(f"Raw body: {body[:200]}...")
-                        return {"status": "error", "message": "Invalid JSON in form payload", "detail": str(json_error)}
+                future = asyncio.get_running_loop().create_future()
+                self._inflight_deliveries[delivery_id] = future
+                try:
+                    result = await self.handle_github_delivery(request.headers, body)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                    future.exception()  # Waiters re-raise it; no need to log it as unretrieved
+                    raise
                 else:
-                    # Try JSON first, then form data
-                    try:
-                        data = await request.json()
-                    except json.JSONDecodeError:
-                        try:
-                            form_data = await request.form()
-                            payload = form_data.get("payload")
-                            if payload:
-                                data = json.loads(payload)
-                            else:
-                                print("Could not parse as JSON or form data")
-                                print(f"Raw body: {body[:200]}...")
-                                return {"status": "error", "message": "Could not parse payload"}
-                        except Exception as parse_error:
-                            print(f"Parse error: {parse_error}")
-                            print(f"Raw body: {body[:200]}...")
-                            return {"status": "error", "message": "Could not parse payload", "detail": str(parse_error)}
-                
-                event_type = request.headers.get("X-GitHub-Event", "unknown")
-                
-                print(f"Received {event_type} event from GitHub")
-                print(f"Repository: {data.get('repository', {}).get('full_name', 'Unknown')}")
-                print(f"Sender: {data.get('sender', {}).get('login', 'Unknown')}")
-                
-                # Store event
-                await self.store_event(event_type, data)
-                
-                # Send automatic notifications
-                await self.process_event_notifications(event_type, data)
-                
-                print(f"Successfully processed {event_type} event")
-                return {"status": "received", "event_type": event_type}
+                    # Only successful deliveries are remembered, so a retry after an error is processed
+                    PROCESSED_EVENTS[delivery_id] = True
+                    future.set_result(result)
+                    return result
+                finally:
+                    del self._inflight_deliveries[delivery_id]
                 
             except Exception as e:
-                print(f"Error processing webhook: {e}")
-                import traceback
-                traceback.print_exc()
+                # Tracebacks are only formatted at DEBUG, so an outage does not add formatting load
+                logger.error("Error processing webhook: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
                 raise HTTPException(status_code=400, detail=str(e))
         
         # Only add MCP endpoint if MCP is available
@@ -573,9 +1016,10 @@ class UnifiedServer:
             @self.app.post("/mcp")
             async def mcp_endpoint(request: Request):
                 """Handle MCP requests from LLMs."""
+                data = None
                 try:
-                    data = await request.json()
-                    print(f"MCP request received: {data}")
+                    data = orjson.loads(await request.body())
+                    logger.debug("MCP request received: %s", data)
                     
                     # Handle MCP protocol requests properly
                     method = data.get("method")
@@ -603,101 +1047,7 @@ class UnifiedServer:
                             "jsonrpc": "2.0",
                             "id": request_id,
                             "result": {
-                                "tools": [
-                                    {
-                                        "name": "analyze_file_changes",
-                                        "description": "Analyze file changes in the current branch compared to base branch.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "base_branch": {"type": "string", "default": "main"},
-                                                "include_diff": {"type": "boolean", "default": True},
-                                                "max_diff_lines": {"type": "integer", "default": 500},
-                                                "working_directory": {"type": "string"}
-                                            }
-                                        }
-                                    },
-                                    {
-                                        "name": "get_pr_templates",
-                                        "description": "Get available PR templates.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {}
-                                        }
-                                    },
-                                    {
-                                        "name": "suggest_template",
-                                        "description": "Suggest appropriate PR template based on changes.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "changes_summary": {"type": "string"},
-                                                "change_type": {"type": "string", "default": "feature"}
-                                            },
-                                            "required": ["changes_summary"]
-                                        }
-                                    },
-                                    {
-                                        "name": "get_recent_actions_events",
-                                        "description": "Get recent GitHub Actions events.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "limit": {"type": "integer", "default": 10}
-                                            }
-                                        }
-                                    },
-                                    {
-                                        "name": "get_workflow_status",
-                                        "description": "Get the current status of GitHub Actions workflows.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "workflow_name": {"type": "string"}
-                                            }
-                                        }
-                                    },
-                                    {
-                                        "name": "get_documentation_workflow_status",
-                                        "description": "Get the status of documentation-related workflows.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {}
-                                        }
-                                    },
-                                    {
-                                        "name": "get_failed_workflows",
-                                        "description": "Get only failed workflows for quick troubleshooting.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {}
-                                        }
-                                    },
-                                    {
-                                        "name": "send_slack_notification",
-                                        "description": "Send a notification to Slack.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "message": {"type": "string"}
-                                            },
-                                            "required": ["message"]
-                                        }
-                                    },
-                                    {
-                                        "name": "send_gmail_notification",
-                                        "description": "Send a notification via Gmail.",
-                                        "inputSchema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "subject": {"type": "string"},
-                                                "message": {"type": "string"},
-                                                "recipient": {"type": "string"}
-                                            },
-                                            "required": ["subject", "message"]
-                                        }
-                                    }
-                                ]
+                                "tools": self._tool_schemas
                             }
                         }
                     elif method == "tools/call":
@@ -706,34 +1056,10 @@ class UnifiedServer:
                         tool_name = params.get("name")
                         arguments = params.get("arguments", {})
                         
-                        # Execute the appropriate tool
-                        if tool_name == "analyze_file_changes":
-                            result = await self.analyze_file_changes(**arguments)
-                        elif tool_name == "get_pr_templates":
-                            result = await self.get_pr_templates()
-                        elif tool_name == "suggest_template":
-                            result = await self.suggest_template(
-                                arguments.get("changes_summary", ""),
-                                arguments.get("change_type", "feature")
-                            )
-                        elif tool_name == "get_recent_actions_events":
-                            result = await self.get_recent_actions_events(**arguments)
-                        elif tool_name == "get_workflow_status":
-                            result = await self.get_workflow_status(arguments.get("workflow_name"))
-                        elif tool_name == "get_documentation_workflow_status":
-                            result = await self.get_documentation_workflow_status()
-                        elif tool_name == "get_failed_workflows":
-                            result = await self.get_failed_workflows()
-                        elif tool_name == "send_slack_notification":
-                            result = await self.send_slack_notification(arguments.get("message", ""))
-                        elif tool_name == "send_gmail_notification":
-                            result = await self.send_gmail_notification(
-                                arguments.get("subject", ""),
-                                arguments.get("message", ""),
-                                arguments.get("recipient")
-                            )
-                        else:
+                        tool = self._tool_dispatch.get(tool_name)
+                        if tool is None:
                             raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
+                        result = await tool(**arguments)
                         
                         # Ensure result is always a non-empty string
                         if not result:
@@ -775,13 +1101,11 @@ class UnifiedServer:
                             }
                         }
                     
-                    print(f"MCP response: {response}")
-                    return response
+                    logger.debug("MCP response: %s", response)
+                    return Response(content=orjson.dumps(response), media_type="application/json")
                     
                 except Exception as e:
-                    print(f"MCP endpoint error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.error("MCP endpoint error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
                     return {
                         "jsonrpc": "2.0",
                         "id": data.get("id") if data else None,
@@ -791,6 +1115,22 @@ class UnifiedServer:
                         }
                     }
             
+            @self.app.post("/call/{tool_name}")
+            async def call_tool(tool_name: str, request: Request):
+                """Direct tool calling endpoint for LLMs."""
+                tool = self._tool_dispatch.get(tool_name)
+                if tool is None:
+                    raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
+                
+                try:
+                    data = orjson.loads(await request.body())
+                    arguments = data.get("arguments", {})
+                    result = await tool(**arguments)
+                    return {"result": result, "tool": tool_name}
+                    
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+            
             @self.app.get("/mcp")
             async def mcp_get_endpoint(request: Request):
                 """Handle MCP GET requests (for discovery and SSE)."""
@@ -846,266 +1186,445 @@ class UnifiedServer:
                 raise HTTPException(status_code=503, detail="MCP functionality not available")
             
             @self.app.post("/call/{tool_name}")
-            async def call_tool(tool_name: str, request: Request):
-                """Direct tool calling endpoint for LLMs."""
-                try:
-                    data = await request.json()
-                    arguments = data.get("arguments", {})
-                    
-                    # Call the appropriate tool
-                    if tool_name == "analyze_file_changes":
-                        result = await self.analyze_file_changes(**arguments)
-                    elif tool_name == "get_pr_templates":
-                        result = await self.get_pr_templates()
-                    elif tool_name == "suggest_template":
-                        result = await self.suggest_template(
-                            arguments.get("changes_summary", ""),
-                            arguments.get("change_type", "feature")
-                        )
-                    elif tool_name == "get_recent_actions_events":
-                        result = await self.get_recent_actions_events(**arguments)
-                    elif tool_name == "get_workflow_status":
-                        result = await self.get_workflow_status(arguments.get("workflow_name"))
-                    elif tool_name == "get_documentation_workflow_status":
-                        result = await self.get_documentation_workflow_status()
-                    elif tool_name == "get_failed_workflows":
-                        result = await self.get_failed_workflows()
-                    elif tool_name == "send_slack_notification":
-                        result = await self.send_slack_notification(arguments.get("message", ""))
-                    elif tool_name == "send_gmail_notification":
-                        result = await self.send_gmail_notification(
-                            arguments.get("subject", ""),
-                            arguments.get("message", ""),
-                            arguments.get("recipient")
-                        )
-                    else:
-                        raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
-                    
-                    return {"result": result, "tool": tool_name}
-                    
-                except Exception as e:
-                    raise HTTPException(status_code=500, detail=str(e))
+            async def call_tool(tool_name: str):
+                """Direct tool calling endpoint when MCP is not available."""
+                raise HTTPException(status_code=503, detail="MCP functionality not available")
     
     def setup_mcp_tools(self):
         """Setup MCP tools for LLM access."""
         if not self.mcp:
-            print("MCP not available, skipping tool setup")
+            logger.info("MCP not available, skipping tool setup")
             return
         
         try:
-            # Import all the original tools from mcp-server
-            import sys
-            import os
-            sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'mcp-server')))
-            
-            # Import the tool modules
-            from tools import pr_analysis, ci_monitor, slack_notifier
+            # Import the tool modules (mcp-server/ is put on sys.path at import time)
+            from tools import pr_analysis, ci_monitor
             from prompts import pr_prompts
             
-            # Register all tools with the MCP instance
             # PR Analysis Tools
-            @self.mcp.tool()
             async def analyze_file_changes(base_branch: str = "main", include_diff: bool = True, max_diff_lines: int = 500, working_directory: str = None) -> str:
                 """Analyze file changes in the current branch compared to base branch."""
                 return await pr_analysis.analyze_file_changes(base_branch, include_diff, max_diff_lines, working_directory)
-            self.analyze_file_changes = analyze_file_changes
 
-            @self.mcp.tool()
             async def get_pr_templates() -> str:
                 """Get available PR templates."""
                 return await pr_analysis.get_pr_templates()
-            self.get_pr_templates = get_pr_templates
 
-            @self.mcp.tool()
-            async def suggest_template(changes_summary: str, change_type: str) -> str:
+            async def suggest_template(changes_summary: str, change_type: str = "feature") -> str:
                 """Suggest appropriate PR template based on changes."""
                 return await pr_prompts.suggest_template(changes_summary, change_type)
-            self.suggest_template = suggest_template
 
             # CI Monitoring Tools
-            @self.mcp.tool()
             async def get_recent_actions_events(limit: int = 10) -> str:
                 """Get recent GitHub Actions events."""
                 return await ci_monitor.get_recent_actions_events(limit)
-            self.get_recent_actions_events = get_recent_actions_events
 
-            @self.mcp.tool()
             async def get_workflow_status(workflow_name: str = None) -> str:
                 """Get the current status of GitHub Actions workflows."""
                 return await ci_monitor.get_workflow_status(workflow_name)
-            self.get_workflow_status = get_workflow_status
 
-            @self.mcp.tool()
             async def get_documentation_workflow_status() -> str:
                 """Get the status of documentation-related workflows."""
                 return await ci_monitor.get_documentation_workflow_status()
-            self.get_documentation_workflow_status = get_documentation_workflow_status
 
-            @self.mcp.tool()
             async def get_failed_workflows() -> str:
                 """Get only failed workflows for quick troubleshooting."""
                 return await ci_monitor.get_failed_workflows()
-            self.get_failed_workflows = get_failed_workflows
 
             # Notification Tools
-            @self.mcp.tool()
             async def send_slack_notification(message: str) -> str:
                 """Send a notification to Slack."""
-                return await slack_notifier.send_slack_notification(message)
-            self.send_slack_notification = send_slack_notification
+                return await self.send_slack_message(message)
 
-            @self.mcp.tool()
             async def send_gmail_notification(subject: str, message: str, recipient: str = None) -> str:
                 """Send a notification via Gmail."""
                 return await self.send_gmail_message(subject, message, recipient)
-            self.send_gmail_notification = send_gmail_notification
 
-            print("MCP tools setup complete.")
-            print("All original tools registered with MCP protocol:")
-            print("  - analyze_file_changes")
-            print("  - get_pr_templates")
-            print("  - suggest_template")
-            print("  - get_recent_actions_events")
-            print("  - get_workflow_status")
-            print("  - get_documentation_workflow_status")
-            print("  - get_failed_workflows")
-            print("  - send_slack_notification")
-            print("  - send_gmail_notification")
-            print("Total: 9 tools available via MCP protocol")
+            # Name -> callable table shared by MCP registration and /call/{tool_name}
+            self._tool_dispatch = {
+                "analyze_file_changes": analyze_file_changes,
+                "get_pr_templates": get_pr_templates,
+                "suggest_template": suggest_template,
+                "get_recent_actions_events": get_recent_actions_events,
+                "get_workflow_status": get_workflow_status,
+                "get_documentation_workflow_status": get_documentation_workflow_status,
+                "get_failed_workflows": get_failed_workflows,
+            }
+            # Notification tools are only offered when their credentials are configured
+            if self.slack_enabled:
+                self._tool_dispatch["send_slack_notification"] = send_slack_notification
+            if self.settings.gmail_user and self.settings.gmail_app_password:
+                self._tool_dispatch["send_gmail_notification"] = send_gmail_notification
+            self._tool_schemas = [schema for schema in MCP_TOOL_SCHEMAS if schema["name"] in self._tool_dispatch]
+            
+            for name, tool in self._tool_dispatch.items():
+                self.mcp.tool(name=name)(tool)
+
+            logger.info("Registered %d MCP tools: %s", len(self._tool_dispatch), ", ".join(self._tool_dispatch))
                 
         except Exception as e:
-            print(f"Error setting up MCP tools: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error setting up MCP tools: %s", e)
     
-    async def store_event(self, event_type: str, data: dict):
-        """Store GitHub event."""
-        # Extract key information from the event
-        repository = data.get("repository", {}).get("full_name") if data.get("repository") else None
-        sender = data.get("sender", {}).get("login") if data.get("sender") else None
-        action = data.get("action")
-        workflow_run = data.get("workflow_run")
-        check_run = data.get("check_run")
+    def _build_tools_listing(self) -> bytes:
+        """Serialize the /tools listing from the registered tool dispatch table."""
+        if not MCP_AVAILABLE:
+            return orjson.dumps({"error": "MCP not available"})
+        if not self.mcp:
+            return orjson.dumps({"error": "MCP instance not initialized"})
+        tools = [
+            {
+                "name": name,
+                "description": inspect.getdoc(tool),
+                "parameters": list(inspect.signature(tool).parameters),
+            }
+            for name, tool in self._tool_dispatch.items()
+        ]
+        return orjson.dumps({
+            "registered_tools": [tool["name"] for tool in tools],
+            "total_registered": len(tools),
+            "tools": tools,
+            "mcp_available": MCP_AVAILABLE,
+            "mcp_initialized": True,
+            "mcp_instance_type": type(self.mcp).__name__,
+            "note": "Listed from the tools registered at startup; each is also callable via the MCP protocol and /call/{tool_name}"
+        })
+    
+    async def handle_github_delivery(self, headers, body: bytes) -> dict:
+        """Parse, store and queue notifications for one GitHub webhook delivery."""
+        if not body:
+            logger.warning("Empty webhook body received")
+            return {"status": "received", "event_type": "empty", "message": "Empty body"}
         
-        # For ping events, extract hook information
-        if event_type == "ping":
-            hook = data.get("hook", {})
-            hook_id = hook.get("id")
-            hook_url = hook.get("config", {}).get("url")
-            repository = data.get("repository", {}).get("full_name")
-            sender = data.get("sender", {}).get("login")
+        event_type = headers.get("X-GitHub-Event", "unknown")
+        if not GITHUB_EVENT_NAME.fullmatch(event_type):
+            logger.warning("Rejected webhook with invalid X-GitHub-Event %r", event_type)
+            return {"status": "error", "message": "Invalid X-GitHub-Event header"}
+        
+        # Pick exactly one payload extractor from the content type
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        extract = WEBHOOK_PAYLOAD_EXTRACTORS.get(media_type)
+        if extract is None:
+            # Unknown content type: a JSON body starts with "{", anything else is treated as form data
+            extract = json_payload if body.lstrip()[:1] == b"{" else form_payload
+        
+        raw = extract(body)
+        if not raw:
+            logger.warning("No payload in form data")
+            return {"status": "error", "message": "No payload in form data"}
+        try:
+            event = msgspec.json.decode(raw, type=GitHubEvent)
+        except msgspec.DecodeError as json_error:
+            logger.warning("JSON decode error: %s", json_error)
+            logger.debug("Raw body: %r...", body[:200])
+            message = "Invalid JSON" if extract is json_payload else "Invalid JSON in form payload"
+            return {"status": "error", "message": message, "detail": str(json_error)}
+        
+        logger.info(
+            "Received %s event from GitHub (repository: %s, sender: %s)",
+            event_type, event.repository_name or "Unknown", event.sender_login or "Unknown"
+        )
         
-        event = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+        # Store event
+        await self.store_event(event_type, event, raw)
+        
+        # Send automatic notifications after responding to GitHub
+        self._spawn(self.process_event_notifications(event_type, event))
+        
+        logger.debug("Successfully processed %s event", event_type)
+        return {"status": "received", "event_type": event_type}
+    
+    def _event_clock(self) -> tuple:
+        """Return (ISO timestamp, payload day directory, payload name stamp) for the current time."""
+        current = time.monotonic()
+        if current >= self._clock_expires:
+            now = datetime.now(timezone.utc)
+            self._clock_strings = (now.isoformat(), now.strftime("%Y/%m/%d"), now.strftime("%Y%m%dT%H%M%S%fZ"))
+            self._clock_expires = current + CLOCK_REFRESH_INTERVAL
+        return self._clock_strings
+    
+    async def store_event(self, event_type: str, event: GitHubEvent, raw: bytes):
+        """Store GitHub event."""
+        timestamp, day_dir, stamp = self._event_clock()
+        payload_path = PAYLOADS_DIR / day_dir / f"{stamp}-{next(self._payload_names)}-{event_type}.json.gz"
+        
+        # Keep only the extracted summary in the event log; the full payload
+        # (push events can be 100+ KB) goes to its own gzipped file
+        record = {
+            "timestamp": timestamp,
             "event_type": event_type,
-            "action": action,
-            "workflow_run": workflow_run,
-            "check_run": check_run,
-            "repository": repository,
-            "sender": sender,
-            "data": data  # Store full data for detailed analysis
+            "action": event.action,
+            "workflow_run": msgspec.to_builtins(event.workflow_run),
+            "check_run": event.check_run,
+            "repository": event.repository_name,
+            "sender": event.sender_login,
+            "payload": str(payload_path)
         }
         
-        events = []
-        if EVENTS_FILE.exists():
-            with open(EVENTS_FILE, 'r') as f:
-                events = json.load(f)
-        
-        events.append(event)
-        events = events[-100:]  # Keep last 100 events
+        # The archived payload is written after the webhook response, like notifications
+        self._spawn(self._archive_payload(payload_path, raw))
         
-        with open(EVENTS_FILE, 'w') as f:
-            json.dump(events, f, indent=2)
+        # The background writer appends buffered lines in batches
+        self._events_appended += 1
+        self._pending_lines.append(orjson.dumps(record) + b"\n")
+        self._events_pending.set()
+    
+    def _prepare_event_log(self):
+        """End a torn last line of the event log, or migrate the legacy JSON file to it."""
+        if EVENTS_LOG.exists():
+            with event_log_lock():
+                terminate_partial_line(EVENTS_LOG)
+        elif EVENTS_FILE.exists():
+            with open(EVENTS_FILE, 'r') as f:
+                events = json.load(f)[-MAX_STORED_EVENTS:]
+            with event_log_lock():
+                self._rewrite_event_log(events)
+    
+    def _append_event_lines(self, lines: List[bytes], fsync: bool = False):
+        """Append serialized events to the event log in a single write."""
+        with event_log_lock(), open(EVENTS_LOG, 'ab') as f:
+            f.write(b"".join(lines))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _rewrite_event_log(self, events: list):
+        """Atomically replace the event log with the given events."""
+        tmp_path = EVENTS_LOG.with_suffix(".jsonl.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(b"".join(orjson.dumps(event) + b"\n" for event in events))
+        os.replace(tmp_path, EVENTS_LOG)
+    
+    def _compact_event_log(self, lines: List[bytes]):
+        """Append pending lines, then trim the shared log to its most recent events."""
+        with event_log_lock():
+            if lines:
+                with open(EVENTS_LOG, 'ab') as f:
+                    f.write(b"".join(lines))
+            # Other workers append to the same log, so trim what is on disk
+            # rather than this process's in-memory view
+            tail = read_last_lines(EVENTS_LOG, MAX_STORED_EVENTS) if EVENTS_LOG.exists() else []
+            tmp_path = EVENTS_LOG.with_suffix(".jsonl.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(b"".join(line + b"\n" for line in tail))
+            os.replace(tmp_path, EVENTS_LOG)
+            self._prune_payloads()
+    
+    def _prune_payloads(self):
+        """Delete all but the newest MAX_STORED_EVENTS archived payloads."""
+        # Paths sort chronologically: payloads/YYYY/MM/DD/<timestamp>-...json.gz
+        payloads = sorted(PAYLOADS_DIR.glob("*/*/*/*.json.gz"))
+        for path in payloads[:-MAX_STORED_EVENTS]:
+            path.unlink(missing_ok=True)
+            for directory in (path.parent, path.parent.parent, path.parent.parent.parent):
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
     
-    async def process_event_notifications(self, event_type: str, data: dict):
+    async def flush_events(self):
+        """Append all buffered event lines to the event log."""
+        async with self._events_lock:
+            if not self._pending_lines:
+                return
+            lines, self._pending_lines = self._pending_lines, []
+            self._flush_count += 1
+            fsync = self._flush_count % EVENTS_FSYNC_EVERY == 0
+            await asyncio.to_thread(self._append_event_lines, lines, fsync)
+    
+    async def _write_events_periodically(self):
+        """Flush buffered events at most every EVENTS_FLUSH_INTERVAL seconds."""
+        while True:
+            await self._events_pending.wait()
+            await asyncio.sleep(EVENTS_FLUSH_INTERVAL)
+            self._events_pending.clear()
+            try:
+                await self.flush_events()
+            except Exception:
+                logger.exception("Error writing event log")
+    
+    async def compact_events(self):
+        """Trim the event log on disk to the most recent MAX_STORED_EVENTS events."""
+        async with self._events_lock:
+            if not self._events_appended:
+                return
+            lines, self._pending_lines = self._pending_lines, []
+            await asyncio.to_thread(self._compact_event_log, lines)
+            self._events_appended = 0
+    
+    async def _compact_events_periodically(self):
+        """Compact the event log every EVENTS_COMPACT_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(EVENTS_COMPACT_INTERVAL)
+            try:
+                await self.compact_events()
+            except Exception:
+                logger.exception("Error compacting event log")
+    
+    async def _archive_payload(self, path: Path, raw: bytes):
+        """Write a webhook payload in the background, logging rather than raising failures."""
+        try:
+            await asyncio.to_thread(self._write_payload, path, raw)
+        except Exception:
+            logger.exception("Error writing webhook payload %s", path)
+    
+    def _write_payload(self, path: Path, raw: bytes):
+        """Write a raw GitHub payload to a gzipped JSON file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'wb') as f:
+            f.write(raw)
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def process_event_notifications(self, event_type: str, event: GitHubEvent):
         """Process event and send notifications."""
+        repo = event.repository_name or "Unknown"
+        
         if event_type == "ping":
             # Handle ping events (webhook verification)
-            repo = data.get("repository", {}).get("full_name", "Unknown")
-            hook_id = data.get("hook", {}).get("id", "Unknown")
-            hook_url = data.get("hook", {}).get("config", {}).get("url", "Unknown")
-            
-            message = f"Webhook ping received from {repo} (Hook ID: {hook_id}, URL: {hook_url})"
-            print(f"PING: {message}")  # Log to console for debugging
-            await self.send_slack_message(message)
+            hook = event.hook or Hook()
+            message = PING_SLACK_TMPL.format_map({
+                "repo": repo,
+                "hook_id": hook.id or "Unknown",
+                "hook_url": (hook.config.url if hook.config else None) or "Unknown",
+            })
+            logger.info("PING: %s", message)
+            if self.slack_enabled:
+                self._queue_slack(message)
             
         elif event_type == "push":
-            repo = data.get("repository", {}).get("full_name", "Unknown")
-            pusher = data.get("pusher", {}).get("name", "Unknown")
-            ref = data.get("ref", "Unknown")
-            
-            message = f"New push to {repo} by {pusher} on {ref}"
-            await self.send_slack_message(message)
+            if not self.slack_enabled:
+                return
+            self._queue_slack(PUSH_SLACK_TMPL.format_map({
+                "repo": repo,
+                "pusher": (event.pusher.name if event.pusher else None) or "Unknown",
+                "ref": event.ref or "Unknown",
+            }))
             
         elif event_type == "workflow_run":
-            workflow = data.get("workflow_run", {})
-            workflow_name = workflow.get("name", "Unknown")
-            conclusion = workflow.get("conclusion")
-            repo = data.get("repository", {}).get("full_name", "Unknown")
+            workflow = event.workflow_run or WorkflowRun()
+            conclusion = workflow.conclusion
             
-            if conclusion == "failure":
-                # Slack notification
-                slack_message = f"CI Failure Alert - Workflow: {workflow_name}, Repository: {repo}, Branch: {workflow.get('head_branch', 'Unknown')}, Run Number: {workflow.get('run_number', 'Unknown')}, View Details: {workflow.get('html_url', '#')}"
-                await self.send_slack_message(slack_message)
-                
-                # Gmail notification
-                email_subject = f"CI Failure Alert - {repo}"
-                email_message = f"""
-                CI Failure Alert
-                
-                A CI workflow has failed:
-                • Workflow: {workflow_name}
-                • Repository: {repo}
-                • Branch: {workflow.get('head_branch', 'Unknown')}
-                • Run Number: {workflow.get('run_number', 'Unknown')}
-                • View Details: {workflow.get('html_url', '#')}
-                
-                Please check the logs and address any issues.
-                """
-                await self.send_gmail_message(email_subject, email_message)
-                
-            elif conclusion == "success":
-                # Slack notification
-                slack_message = f"Deployment Successful - Workflow: {workflow_name}, Repository: {repo}, Branch: {workflow.get('head_branch', 'Unknown')}, Run Number: {workflow.get('run_number', 'Unknown')}, View Details: {workflow.get('html_url', '#')}"
-                await self.send_slack_message(slack_message)
-                
-                # Gmail notification
-                email_subject = f"Deployment Successful - {repo}"
-                email_message = f"""
-                Deployment Successful
-                
-                A workflow has completed successfully:
-                • Workflow: {workflow_name}
-                • Repository: {repo}
-                • Branch: {workflow.get('head_branch', 'Unknown')}
-                • Run Number: {workflow.get('run_number', 'Unknown')}
-                • View Details: {workflow.get('html_url', '#')}
-                
-                Deployment completed successfully!
-                """
-                await self.send_gmail_message(email_subject, email_message)
+            # Runs are grouped per (repo, conclusion) and rendered at flush time,
+            # so a burst of matrix runs becomes one message per group
+            if conclusion in WORKFLOW_NOTICES and (self.slack_enabled or self.gmail_enabled):
+                self._workflow_batch.setdefault((repo, conclusion), []).append({
+                    "name": workflow.name or "Unknown",
+                    "repo": repo,
+                    "branch": workflow.head_branch or "Unknown",
+                    "run_number": workflow.run_number or "Unknown",
+                    "url": workflow.html_url or "#",
+                })
+                self._queued_workflow_runs += 1
+                self._signal_notifications()
+    
+    def _queue_slack(self, message: str):
+        """Queue a Slack notification for the next coalesced post."""
+        self._slack_batch.append(message)
+        self._signal_notifications()
+    
+    def _signal_notifications(self):
+        """Wake the notification flusher, early if a batch is full."""
+        self._notify_pending.set()
+        if len(self._slack_batch) + self._queued_workflow_runs >= NOTIFY_BATCH_SIZE:
+            self._notify_full.set()
+    
+    async def flush_notifications(self):
+        """Send queued notifications as one Slack post per batch and one email."""
+        slack_batch, self._slack_batch = self._slack_batch, []
+        workflow_batch, self._workflow_batch = self._workflow_batch, {}
+        self._queued_workflow_runs = 0
+        
+        email_batch = []
+        for (repo, conclusion), runs in workflow_batch.items():
+            if self.slack_enabled:
+                slack_batch.append(render_workflow_slack(repo, conclusion, runs))
+            if self.gmail_enabled:
+                email_batch.append(render_workflow_email(repo, conclusion, runs))
+        
+        # Slack and Gmail are independent, so send them concurrently
+        sends = [
+            self.send_slack_message("\n---\n".join(slack_batch[i:i + NOTIFY_BATCH_SIZE]))
+            for i in range(0, len(slack_batch), NOTIFY_BATCH_SIZE)
+        ]
+        if len(email_batch) == 1:
+            sends.append(self.send_gmail_message(*email_batch[0]))
+        elif email_batch:
+            subject = f"MCP-AutoPRX: {len(email_batch)} CI notifications"
+            message = "\n\n---\n\n".join(f"{item_subject}\n{body}" for item_subject, body in email_batch)
+            sends.append(self.send_gmail_message(subject, message))
+        
+        await asyncio.gather(*sends)
+    
+    async def _flush_notifications_periodically(self):
+        """Flush notifications NOTIFY_FLUSH_INTERVAL seconds after the first is queued, until stopped."""
+        while not self._notify_stopping:
+            await self._notify_pending.wait()
+            try:
+                await asyncio.wait_for(self._notify_full.wait(), NOTIFY_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._notify_pending.clear()
+            self._notify_full.clear()
+            try:
+                await self.flush_notifications()
+            except Exception:
+                logger.exception("Error sending notifications")
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_MAX_CONNECTIONS,
+                    limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+                    keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                    ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+                ),
+                timeout=HTTP_TIMEOUT
+            )
+        return self._http
     
     async def send_slack_message(self, message: str) -> str:
         """Send message to Slack."""
-        webhook_url = os.getenv("SLACK_WEBHOOK_URL")
+        webhook_url = self.settings.slack_webhook_url
         if not webhook_url:
             return "Error: SLACK_WEBHOOK_URL not set"
         
-        try:
-            payload = {"text": message, "mrkdwn": True}
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            if response.status_code == 200:
-                return "Slack message sent successfully"
-            else:
-                return f"Slack error: {response.status_code}"
-        except Exception as e:
-            return f"Slack error: {str(e)}"
+        payload = orjson.dumps({"text": message, "mrkdwn": True})
+        # Retry transient failures (network errors, 429, 5xx); other errors fail fast
+        for attempt in range(1, SLACK_MAX_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                async with self._slack_semaphore:
+                    async with self._get_http_session().post(webhook_url, data=payload, headers=JSON_HEADERS) as response:
+                        if response.status == 200:
+                            return "Slack message sent successfully"
+                        if response.status not in SLACK_RETRY_STATUSES or attempt == SLACK_MAX_ATTEMPTS:
+                            return f"Slack error: {response.status}"
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == SLACK_MAX_ATTEMPTS:
+                    return f"Slack error: {str(e) or type(e).__name__}"
+            except Exception as e:
+                return f"Slack error: {str(e)}"
+            await asyncio.sleep(self._slack_retry_delay(attempt, retry_after))
+    
+    def _slack_retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before the next Slack attempt, honouring Retry-After."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), SLACK_RETRY_MAX_DELAY)
+        return random.uniform(0, min(SLACK_RETRY_BASE_DELAY * 2 ** (attempt - 1), SLACK_RETRY_MAX_DELAY))
     
     async def send_gmail_message(self, subject: str, message: str, recipient: str = None) -> str:
         """Send message via Gmail."""
-        gmail_user = os.getenv("GMAIL_USER")
-        gmail_password = os.getenv("GMAIL_APP_PASSWORD")
-        default_recipient = os.getenv("DEFAULT_EMAIL_RECIPIENT")
+        gmail_user = self.settings.gmail_user
+        gmail_password = self.settings.gmail_app_password
+        default_recipient = self.settings.default_email_recipient
         
         if not gmail_user or not gmail_password:
             return "Error: GMAIL_USER and GMAIL_APP_PASSWORD not set"
@@ -1115,74 +1634,160 @@ class UnifiedServer:
             return "Error: No recipient email specified"
         
         try:
-            msg = MIMEMultipart()
-            msg['From'] = gmail_user
-            msg['To'] = recipient
-            msg['Subject'] = subject
-            
-            html_body = f"""
-            <html>
-            <body>
-                <h2>{subject}</h2>
-                <div style="font-family: Arial, sans-serif; line-height: 1.6;">
-                    {message.replace(chr(10), '<br>')}
-                </div>
-                <hr>
-                <p style="color: #666; font-size: 12px;">
-                    Sent by MCP-AutoPRX Unified Server
-                </p>
-            </body>
-            </html>
-            """
+            html_body = render_html(subject, message, EMAIL_FOOTER)
+            raw = render_email(gmail_user, recipient, subject, message, html_body)
             
-            msg.attach(MIMEText(html_body, 'html'))
-            
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(gmail_user, gmail_password)
-            text = msg.as_string()
-            server.sendmail(gmail_user, recipient, text)
-            server.quit()
+            await self._send_pooled_email(gmail_user, [parseaddr(recipient)[1]], raw)
             
             return f"Gmail sent successfully to {recipient}"
             
         except Exception as e:
             return f"Gmail error: {str(e)}"
     
-    def run(self):
-        """Run the unified server."""
+    async def _send_pooled_email(self, sender: str, recipients: List[str], raw: bytes):
+        """Send a rendered message over a pooled Gmail connection, opening one if needed."""
+        smtp, sent, last_used = await self._smtp_pool.get()
         try:
-            port = int(os.getenv("PORT", 8080))
-            
-            print("Starting MCP-AutoPRX Unified Server...")
-            print(f"Server will be available at: http://0.0.0.0:{port}")
-            print("Combined services:")
-            print("  - GitHub webhook handling")
-            print("  - MCP server for LLMs")
-            print("  - Slack and Gmail notifications")
-            print("Available endpoints:")
-            print("  - / (server info)")
-            print("  - /health (health check)")
-            print("  - /tools (list available tools)")
-            print("  - /webhook/github (GitHub webhooks)")
-            print("  - /mcp (MCP endpoint)")
-            print("  - /call/{tool_name} (direct tool calling)")
-            print("  - /docs (API documentation)")
-            print()
-            
-            if not FASTAPI_AVAILABLE:
-                print("FastAPI not available. Install with: pip install fastapi uvicorn")
-                return
-            
-            print("Starting uvicorn server...")
-            uvicorn.run(self.app, host="0.0.0.0", port=port, log_level="info")
-            
-        except Exception as e:
-            print(f"Error starting server: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+            if (smtp is not None and smtp.is_connected
+                    and time.monotonic() - last_used > SMTP_IDLE_CHECK_SECONDS):
+                # Gmail drops idle sessions; check before reusing one that sat unused
+                try:
+                    await smtp.noop()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+                    smtp = None
+            for attempt in range(2):
+                if smtp is None or not smtp.is_connected or sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+                    if smtp is not None:
+                        smtp.close()
+                    smtp, sent = None, 0
+                    client = aiosmtplib.SMTP(
+                        hostname='smtp.gmail.com',
+                        port=587,
+                        start_tls=True,
+                        username=self.settings.gmail_user,
+                        password=self.settings.gmail_app_password
+                    )
+                    await client.connect()
+                    smtp = client
+                try:
+                    await smtp.sendmail(sender, recipients, raw)
+                    sent += 1
+                    return
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Dropped between check and send; retry once on a fresh connection
+                    smtp.close()
+                    smtp, sent = None, 0
+                    if attempt:
+                        raise
+        finally:
+            self._smtp_pool.put_nowait((smtp, sent, time.monotonic()))
+    
+    async def _close_smtp_pool(self):
+        """QUIT every idle pooled Gmail connection, leaving the slots reusable."""
+        for _ in range(self._smtp_pool.qsize()):
+            smtp, _, _ = self._smtp_pool.get_nowait()
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+            self._smtp_pool.put_nowait((None, 0, 0.0))
+
+def build_log_config(log_level: str = "info") -> dict:
+    """Return uvicorn's logging config extended with the mcp_autoprx logger."""
+    log_config = copy.deepcopy(uvicorn.config.LOGGING_CONFIG)
+    log_config["loggers"]["mcp_autoprx"] = {"handlers": ["default"], "level": log_level.upper(), "propagate": False}
+    return log_config
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records below WARNING instead of blocking when the queue is full."""
+    
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # The listener runs in this process, so the record is passed on as-is and its
+        # handlers do the formatting (including any traceback) on the listener thread
+        return record
+    
+    def enqueue(self, record):
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def start_queue_logging(target: logging.Logger) -> Optional[logging.handlers.QueueListener]:
+    """Move the logger's handlers onto a listener thread fed through a bounded queue."""
+    handlers = list(target.handlers)
+    if not handlers:
+        return None
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(DroppingQueueHandler(log_queue))
+    listener.start()
+    return listener
+
+def stop_queue_logging(target: logging.Logger, listener: logging.handlers.QueueListener):
+    """Drain the queue and hand the listener's handlers back to the logger."""
+    listener.stop()
+    dropped = 0
+    for handler in list(target.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            dropped += handler.dropped
+            target.removeHandler(handler)
+    for handler in listener.handlers:
+        target.addHandler(handler)
+    if dropped:
+        target.warning("Dropped %d log records while the log queue was full", dropped)
+
+def create_app():
+    """Build the ASGI app; used by uvicorn to start each worker process."""
+    return UnifiedServer().app
+
+def run(settings: Settings):
+    """Run the unified server."""
+    try:
+        port = settings.port
+        
+        if not FASTAPI_AVAILABLE:
+            print("FastAPI not available. Install with: pip install fastapi uvicorn")
+            return
+        
+        # Route our logger through uvicorn's handlers so both share one format
+        log_config = build_log_config(settings.log_level)
+        logging.config.dictConfig(log_config)
+        
+        logger.info("Starting MCP-AutoPRX Unified Server...")
+        logger.info("Server will be available at: http://0.0.0.0:%d", port)
+        logger.info(
+            "Combined services: GitHub webhook handling, MCP server for LLMs, "
+            "Slack and Gmail notifications"
+        )
+        logger.info(
+            "Available endpoints: / (server info), /health (health check), "
+            "/tools (list available tools), /webhook/github (GitHub webhooks), "
+            "/mcp (MCP endpoint), /call/{tool_name} (direct tool calling), "
+            "/docs (API documentation)"
+        )
+        
+        workers = settings.web_concurrency
+        logger.info("Starting uvicorn server with %d worker(s)...", workers)
+        # "auto" picks uvloop and httptools when installed (uvicorn[standard] has no uvloop on Windows)
+        options = dict(host="0.0.0.0", port=port, log_level=settings.log_level, loop="auto", http="auto",
+                       interface="asgi3", log_config=log_config)
+        # Each worker process builds its own server through the factory
+        uvicorn.run("unified_server:create_app", factory=True, workers=workers, **options)
+        
+    except Exception:
+        logger.exception("Error starting server")
+        raise
 
 if __name__ == "__main__":
-    server = UnifiedServer()
-    server.run() 
\ No newline at end of file
+    run(Settings.from_env()) 
\ No newline at end of file